@@ -29,26 +29,26 @@ ASSOC_EXTRACTED_DIR = "output/association/{model}/{dataset}"
 EXPERIMENT_OUTPUT_DIR = "output/experiment"
 
 # 4. Skip keywords for class extraction
-SKIP_KEYWORDS = [
-    '**Class List:**', 
-    '**Final Class List:**', 
-    '[Class 1, Class 2, Class 3,...]', 
+SKIP_KEYWORDS = frozenset({
+    '**Class List:**',
+    '**Final Class List:**',
+    '[Class 1, Class 2, Class 3,...]',
     'List:**',
     "**Refined List of Class Candidates:**",
     "**Rationale:**",
     "**Final Class List**",
     '**List**',
     'List**',
-    '**Class List**'
+    '**Class List**',
     '**Rationale**',
-    'Rationale: '
+    'Rationale: ',
     '**Domain Entities:**',
     'Removed',
     'removed',
     'redundant',
     'irrelevant',
-    'vague'
-    ]
+    'vague',
+})
 
 
 
@@ -1,6 +1,6 @@
 import re
 import os
-import pandas as pd
+from itertools import repeat
 
 from class_assoc_pipeline.config import ASSOC_INPUT_TEMPLATE, ASSOC_EXTRACTED_DIR
 from class_assoc_pipeline.utils.text_utils import (
@@ -9,126 +9,151 @@ from class_assoc_pipeline.utils.text_utils import (
     parse_association_line,
     combine_and_deduplicate_associations
 )
+from class_assoc_pipeline.utils.file_io import read_utf8
+from class_assoc_pipeline.utils.parallel_utils import run_parallel
+
+# === Patterns shared by the extractors (compiled once per process) ===
+_ASSISTANT_RE = re.compile(r'Assistant :', re.IGNORECASE)
+_STEP3_RE = re.compile(r"Step\s*3:.*?Associations? in 'X-Y'", re.IGNORECASE)
+_FINAL_RE = re.compile(r"Here is the final list of associations?:", re.IGNORECASE)
+# GPT-o1 lines are plain "X-Y" or carry a role, "X-(role)-Y"; one pattern covers both
+_GPT_LINE_RE = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+(?:-\([\w\s&]+\))?-[\w\s()]+$")
+_XY_RE = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+-[\w\s()]+$")
+_OPT_TAG_RE = re.compile(r'\((optional|opt)\)', re.IGNORECASE)
+# Section anchors of the Llama/Qwen logs, found together in one forward scan
+_ANCHOR_RE = re.compile(
+    r"(?P<assist>Assistant :)|(?P<think></think>)|(?P<final>Here is the final list of associations?:)",
+    re.IGNORECASE,
+)
 
 # === Extractor functions for different model outputs ===
 
+def _locate_final_list(content: str, need_think: bool) -> tuple[int | None, str | None]:
+    """
+    Walk the section anchors once: the third 'Assistant :' marker, then (for
+    Qwen) the closing </think>, then the final-list header.
+
+    Returns (offset just past the final-list header, None) on success, or
+    (None, stage) where stage names the anchor that was never reached
+    ("assistant", "think" or "final").
+    """
+    assistants = 0
+    stage = "assistant"
+    for m in _ANCHOR_RE.finditer(content):
+        kind = m.lastgroup
+        if stage == "assistant":
+            if kind == "assist":
+                assistants += 1
+                if assistants == 3:
+                    stage = "think" if need_think else "final"
+        elif stage == "think":
+            if kind == "think":
+                stage = "final"
+        elif kind == "final":
+            return m.end(), None
+    return None, stage
+
+
+def _strip_numbering(ln: str) -> str:
+    """
+    Drop a leading "12." list number and the whitespace after it (the same
+    text as r'^\d+\.\s*'), checking characters directly instead of running
+    a regex on every kept line.
+    """
+    if not ln or not ln[0].isdecimal():
+        return ln
+    i = 1
+    n = len(ln)
+    while i < n and ln[i].isdecimal():
+        i += 1
+    if i < n and ln[i] == ".":
+        return ln[i + 1:].lstrip()
+    return ln
+
+
+def _collect_associations(lines: list[str], line_re: re.Pattern) -> tuple[list[str], list[str]]:
+    """
+    Split lines shaped like line_re into (refined, optional) associations;
+    untagged lines after the first blank line are dropped.
+    """
+    refined, optional = [], []
+    reading_mand = True
+
+    rtn = remove_trailing_notes_association
+    line_match = line_re.match
+    opt_search = _OPT_TAG_RE.search
+    strip_numbering = _strip_numbering
+    ref_append = refined.append
+    opt_append = optional.append
+
+    for ln in lines:
+        ln = rtn(ln)
+        if ln == "":
+            reading_mand = False
+            continue
+        if line_match(ln):
+            if opt_search(ln):
+                opt_append(strip_numbering(ln))
+            elif reading_mand:
+                ref_append(strip_numbering(ln))
+
+    return combine_and_deduplicate_associations(refined, optional)
+
+
 def extract_gpt_o1_associations(content: str) -> tuple[list[str], list[str]]:
     """
     Extract mandatory and optional associations from GPT-o1 raw output.
     """
-    assistants = list(re.finditer(r'ASSISTANT :', content, re.IGNORECASE))
+    assistants = list(_ASSISTANT_RE.finditer(content))
     if len(assistants) < 2:
         return [], []
-    content = content[assistants[1].end():].strip()
+    content = content[assistants[1].end():]
 
-    m2 = re.search(r"Step\s*3:.*?Associations? in 'X-Y'", content, re.IGNORECASE)
+    m2 = _STEP3_RE.search(content)
     if not m2:
         return [], []
-    content = content[m2.end():].strip()
+    content = content[m2.end():]
 
-    m3 = re.search(r"Here is the final list of associations?:", content, re.IGNORECASE)
+    m3 = _FINAL_RE.search(content)
     if not m3:
         return [], []
     content = content[m3.end():].strip()
 
-    lines = content.splitlines()
-    refined, optional = [], []
-    reading_mand = True
-
-    complex_pat = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+-\([\w\s&]+\)-[\w\s()]+$")
-    simple_pat = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+-[\w\s()]+$")
-
-    for ln in lines:
-        ln = remove_trailing_notes_association(ln)
-        if ln == "":
-            reading_mand = False
-            continue
-        if complex_pat.match(ln) or simple_pat.match(ln):
-            if re.search(r'\((optional|opt)\)', ln, flags=re.IGNORECASE):
-                ln = re.sub(r'^\d+\.\s*', '', ln)
-                optional.append(ln)
-            elif reading_mand:
-                ln = re.sub(r'^\d+\.\s*', '', ln)
-                refined.append(ln)
-    refined, optional = combine_and_deduplicate_associations(refined, optional)
-    return refined, optional
+    return _collect_associations(content.splitlines(), _GPT_LINE_RE)
 
 
 def extract_llama3_8b_associations(content: str) -> tuple[list[str], list[str]]:
     """
     Extract mandatory and optional associations from Llama 3 8B raw output.
     """
-    assistants = list(re.finditer(r'Assistant :', content, re.IGNORECASE))
-    if len(assistants) < 3:
+    end, missing = _locate_final_list(content, need_think=False)
+    if missing == "assistant":
         print("⚠️ Less than 3 'Assistant:' markers")
         return [], []
-    content = content[assistants[2].end():].strip()
-
-    m = re.search(r"Here is the final list of associations?:", content, re.IGNORECASE)
-    if not m:
+    if end is None:
         return [], []
-    lines = content[m.end():].strip().splitlines()
-
-    refined, optional = [], []
-    reading_mand = True
-    xy_pat = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+-[\w\s()]+$")
+    lines = content[end:].strip().splitlines()
 
-    for ln in lines:
-        ln = remove_trailing_notes_association(ln)
-        if ln == "":
-            reading_mand = False
-            continue
-        if re.search(r'\((optional|opt)\)', ln, flags=re.IGNORECASE) and xy_pat.match(ln):
-            ln = re.sub(r'^\d+\.\s*', '', ln)
-            optional.append(ln)
-        elif reading_mand and xy_pat.match(ln):
-            ln = re.sub(r'^\d+\.\s*', '', ln)
-            refined.append(ln)
-
-    refined, optional = combine_and_deduplicate_associations(refined, optional)
-    return refined, optional
+    return _collect_associations(lines, _XY_RE)
 
 
 def extract_qwen14b_associations(content: str) -> tuple[list[str], list[str]]:
     """
     Extract mandatory and optional associations from Qwen14B raw output.
     """
-    assistants = list(re.finditer(r'Assistant :', content, re.IGNORECASE))
-    if len(assistants) < 3:
+    end, missing = _locate_final_list(content, need_think=True)
+    if missing == "assistant":
         print("⚠️ Less than 3 'Assistant :' markers")
         return [], []
-    content = content[assistants[2].end():].strip()
-
-    m2 = re.search(r"</think>", content, re.IGNORECASE)
-    if not m2:
+    if missing == "think":
         print("⚠️ Missing '</think>' marker")
         return [], []
-    content = content[m2.end():].strip()
-
-    m3 = re.search(r"Here is the final list of associations?:", content, re.IGNORECASE)
-    if not m3:
+    if missing == "final":
         print("⚠️ Missing 'final list of associations' marker")
         return [], []
-    lines = content[m3.end():].strip().splitlines()
-
-    refined, optional = [], []
-    reading_mand = True
-    xy_pat = re.compile(r"^[\d\*\-\.\s]*[\w\s()]+-[\w\s()]+$")
-
-    for ln in lines:
-        ln = remove_trailing_notes_association(ln)
-        if ln == "":
-            reading_mand = False
-            continue
-        if re.search(r'\((optional|opt)\)', ln, flags=re.IGNORECASE) and xy_pat.match(ln):
-            ln = re.sub(r'^\d+\.\s*', '', ln)
-            optional.append(ln)
-        elif reading_mand and xy_pat.match(ln):
-            ln = re.sub(r'^\d+\.\s*', '', ln)
-            refined.append(ln)
+    lines = content[end:].strip().splitlines()
 
-    refined, optional = combine_and_deduplicate_associations(refined, optional)
-    return refined, optional
+    return _collect_associations(lines, _XY_RE)
 
 
 # Mapping from model name to corresponding extractor
@@ -139,51 +164,79 @@ EXTRACTORS = {
 }
 
 
-def extract_associations_by_model(content: str, model: str) -> tuple[list[str], list[str]]:
+def _no_associations(content: str) -> tuple[list[str], list[str]]:
+    return [], []
+
+
+def resolve_extractor(model: str):
     """
-    Route content to the correct model-specific extractor function.
+    Look up the model-specific extractor function once per dataset.
+    Unsupported models get an extractor that finds nothing.
     """
     fn = EXTRACTORS.get(model.lower())
     if not fn:
         print(f"⚠️ Unsupported model '{model}' for association extraction.")
-        return [], []
-    return fn(content)
+        return _no_associations
+    return fn
 
 
-def process_file(input_file: str, output_file: str, model: str) -> None:
+def extract_associations_by_model(content: str, model: str) -> tuple[list[str], list[str]]:
+    """
+    Route content to the correct model-specific extractor function.
     """
-    Read raw model output, extract associations, and write cleaned associations to file.
+    return resolve_extractor(model)(content)
+
+
+def process_file(input_file: str, output_file: str, extractor) -> list[str] | None:
+    """
+    Read raw model output, extract associations with the given (already
+    resolved) extractor, and write cleaned associations to file. The output
+    folder is expected to exist (process_dataset creates it).
+
+    Returns the cleaned lines that were written (None if nothing was written),
+    so the Excel step can reuse them without re-reading the file.
     """
     try:
-        content = open(input_file, encoding="utf-8").read()
+        content = read_utf8(input_file)
     except FileNotFoundError:
         print(f"❌ File not found: {input_file}")
-        return
+        return None
 
-    refined, optional = extract_associations_by_model(content, model)
+    refined, optional = extractor(content)
     if not refined and not optional:
         print(f"⚠️ No associations found in {input_file}")
-        return
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        return None
+    cleaned = [clean_association_line(ln) for ln in refined]
+    cleaned += [clean_association_line(ln, force_optional=True) for ln in optional]
     with open(output_file, "w", encoding="utf-8") as out:
-        for ln in refined:
-            out.write(clean_association_line(ln) + "\n")
-        for ln in optional:
-            out.write(clean_association_line(ln, force_optional=True) + "\n")
+        out.writelines(f"{ln}\n" for ln in cleaned)
+    return cleaned
 
 
-def process_dataset(model: str, dataset: str, rounds: int) -> None:
+def process_dataset(model: str, dataset: str, rounds: int,
+                    workers: int | None = None, extractor=None) -> dict[int, list[str]]:
     """
     Process all rounds of a specific (model, dataset) pair.
+    extractor is the model's association extractor (resolved here if omitted).
+
+    Rounds are independent, so they run in parallel worker processes (workers
+    caps the pool, default one per CPU, never more than the rounds; a pool
+    of 1 or less runs them serially here).
+    Returns {round: cleaned lines} for every round that produced output.
     """
     # rounds = MODELS.get(model, 5)
-    for r in range(1, rounds + 1):
-        # inp = ASSOC_INPUT_TEMPLATE.format(model=model, dataset=dataset, round=r)
-        inp = ASSOC_INPUT_TEMPLATE.format(model=model, dataset=dataset, round=r)
-        # outd = ASSOC_EXTRACTED_DIR.format(model=model, dataset=dataset)
-        outd = ASSOC_EXTRACTED_DIR.format(model=model, dataset=dataset)
-        outp = os.path.join(outd, f"extracted_associations_round{r}.txt")
-        process_file(inp, outp, model)
+    round_ids = range(1, rounds + 1)
+    outd = ASSOC_EXTRACTED_DIR.format(model=model, dataset=dataset)
+    os.makedirs(outd, exist_ok=True)  # once per dataset, not once per round
+    inputs = [ASSOC_INPUT_TEMPLATE.format(model=model, dataset=dataset, round=r) for r in round_ids]
+    outputs = [os.path.join(outd, f"extracted_associations_round{r}.txt") for r in round_ids]
+
+    if extractor is None:
+        extractor = resolve_extractor(model)
+
+    results = run_parallel(process_file, zip(inputs, outputs, repeat(extractor)), workers)
+
+    return {r: lines for r, lines in zip(round_ids, results) if lines is not None}
 
 
 def process_round_file(input_file: str) -> list[list[str]]:
@@ -200,38 +253,70 @@ def process_round_file(input_file: str) -> list[list[str]]:
     return out
 
 
-def convert_dataset_to_excel(model: str, dataset: str, num_rounds: int = 10) -> None:
+def _is_optional_pair(pair: list[str]) -> bool:
+    return "(opt)" in pair[0].lower()
+
+
+def convert_dataset_to_excel(
+    model: str,
+    dataset: str,
+    num_rounds: int = 10,
+    round_lines: dict[int, list[str]] | None = None,
+) -> None:
     """
     Convert all rounds of one dataset to an Excel file, each round as a sheet.
+
+    round_lines holds cleaned lines already in memory (from process_dataset);
+    rounds missing from it are read back from their .txt files.
     """
+    round_lines = round_lines or {}
     # out_xlsx_dir = ASSOC_EXTRACTED_DIR.format(model=model, dataset=dataset)
     out_xlsx_dir = ASSOC_EXTRACTED_DIR.format(model=model, dataset=dataset)
     out_xlsx_path = os.path.join(out_xlsx_dir, f"extracted_associaiton.xlsx")
-    writer = pd.ExcelWriter(out_xlsx_path, engine="xlsxwriter")
+    # Rows are plain [X, Y] string pairs, so they are streamed straight into
+    # the worksheet instead of going through a DataFrame per round. The writer
+    # is imported here so the parsing path stays free of Excel dependencies.
+    # Rows go out strictly in order, so constant_memory can flush each one.
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(out_xlsx_path, {"constant_memory": True})
+    header_fmt = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
 
     for r in range(1, num_rounds + 1):
-        txt_path = os.path.join(out_xlsx_dir, f"extracted_associations_round{r}.txt")
-        pairs = process_round_file(txt_path)
+        lines = round_lines.get(r)
+        if lines is not None:
+            pairs = [pair for ln in lines for pair in parse_association_line(ln)]
+        else:
+            txt_path = os.path.join(out_xlsx_dir, f"extracted_associations_round{r}.txt")
+            pairs = process_round_file(txt_path)
         if not pairs:
             continue
-        df = pd.DataFrame(pairs, columns=["X", "Y"])
 
-        # Move optional associations to the bottom
-        mask = df["X"].str.contains(r'\(Opt\)', case=False)
-        df = pd.concat([df[~mask], df[mask]], ignore_index=True)
-        df.to_excel(writer, sheet_name=f"Round{r}", index=False)
+        # Move optional associations to the bottom (list.sort is stable, so
+        # both groups keep their original order)
+        pairs.sort(key=_is_optional_pair)
 
-    writer.close()
+        ws = workbook.add_worksheet(f"Round{r}")
+        ws.write_row(0, 0, ["X", "Y"], header_fmt)
+        for i, pair in enumerate(pairs, start=1):
+            ws.write_row(i, 0, pair)
+
+    workbook.close()
     print(f"Report is saved to {out_xlsx_path}")
 
 
 
-def run_extraction_pipeline(model: str, dataset: str, rounds: int):
+def run_extraction_pipeline(model: str, dataset: str, rounds: int, workers: int | None = None):
     """
     Public interface to run the whole extraction pipeline.
+    Set workers to bound the number of round-parsing processes.
     """
     print(f"🔍 Extracting Association Conversation Log for {model} | {dataset.capitalize()} | {rounds} rounds")
-    process_dataset(model, dataset, rounds)
-    convert_dataset_to_excel(model, dataset, rounds)
+    # Resolved once up front: an unsupported model would find nothing in any
+    # round, so stop before spawning workers or writing an empty workbook
+    extractor = resolve_extractor(model)
+    if extractor is _no_associations:
+        return
+    round_lines = process_dataset(model, dataset, rounds, workers, extractor)
+    convert_dataset_to_excel(model, dataset, rounds, round_lines)
     print(f"✅ Done Extraction of Association Conversation Log for {model} | {dataset.capitalize()} | {rounds} rounds")
 
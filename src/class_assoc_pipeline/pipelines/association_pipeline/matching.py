@@ -1,5 +1,5 @@
 from class_assoc_pipeline.utils.text_utils import normalize_word, remove_trailing_notes_association
-from class_assoc_pipeline.utils.data_utils import expand_synonym_mapping, generate_candidates
+from class_assoc_pipeline.utils.data_utils import OPT_PREFIX_RE, expand_synonym_mapping, synonym_expander
 from class_assoc_pipeline.utils.metrics import perform_matching_associations, compute_metrics
 from class_assoc_pipeline.config import (
     ASSOC_INPUT_TEMPLATE,
@@ -13,14 +13,33 @@ from ...utils.file_io import (
     load_excel_sheets,
     write_results_to_excel,
     write_experiment_log,
+    write_counts_to_excel,
 )
 
 from collections import Counter
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
+import numpy as np
 import os
 
 
+@lru_cache(maxsize=None)
+def _standards(ds: str):
+    """
+    Normalized gold/silver association sets and the synonym expander for one
+    dataset. They depend only on the dataset, so they are built once and
+    returned frozen (the cached objects are shared by every caller).
+    """
+    gold_raw = GOLD_STANDARD_ASSOCIATION[ds]
+    silver_raw = SILVER_STANDARD_ASSOCIATION.get(ds, [])
+    # Pairs are keyed as sorted (X, Y) tuples, the same shape as the extracted pairs
+    gold_set = frozenset(tuple(sorted(map(normalize_word, pair))) for pair in gold_raw)
+    silver_set = frozenset(tuple(sorted(map(normalize_word, pair))) for pair in silver_raw)
+    syn_map = synonym_expander(expand_synonym_mapping(SYNONYM_DICT_CLASS[ds]))
+    return gold_set, silver_set, syn_map
+
+
 def evaluation_experiment(model: str, dataset: str) -> None:
     """
     Process a given model's association extraction results across all datasets and rounds:
@@ -40,30 +59,27 @@ def evaluation_experiment(model: str, dataset: str) -> None:
     sheets = load_excel_sheets(report_path)
 
     # Load gold and silver standards, and prepare synonym mapping
-    gold_raw = GOLD_STANDARD_ASSOCIATION[ds]
-    silver_raw = SILVER_STANDARD_ASSOCIATION.get(ds, [])
-    gold_set = {frozenset(map(normalize_word, pair)) for pair in gold_raw}
-    silver_set = {frozenset(map(normalize_word, pair)) for pair in silver_raw}
-    syn_map = expand_synonym_mapping(SYNONYM_DICT_CLASS[ds])
+    gold_set, silver_set, syn_map = _standards(ds)
 
-    full_log = ""
+    log_parts = []  # joined once after the last round
     mand_results = []
     all_results = []
-    all_unmatched = []
+    unmatched_counter = Counter()  # false positives across all rounds
 
     for round_idx, (sheet_name, df_raw) in enumerate(sheets.items()):
-        # Normalize input associations and identify optional ones
-        df = df_raw.copy()
-        df["X"] = df["X"].map(normalize_word)
-        df["Y"] = df["Y"].map(normalize_word)
-        df["opt"] = df["X"].str.contains(r'^\((?:opt|optional)\)', case=False, regex=True)
-        df["X"] = df["X"].str.replace(r'^\(opt\)\s*', "", regex=True)
-
-        pairs = [
-            tuple(sorted((x, y)))
-            for x, y in df[["X", "Y"]].itertuples(index=False, name=None)
-        ]
-        # print(pairs)
+        # Normalize input associations (X and Y stacked into one column for a
+        # single normalize_word pass) and identify optional ones
+        # The loaded sheet is not used again, so it is updated in place
+        df = df_raw
+        n = len(df)
+        both = pd.concat([df["X"], df["Y"]], ignore_index=True).map(normalize_word)
+        df["X"] = both.iloc[:n].to_numpy()
+        df["Y"] = both.iloc[n:].to_numpy()
+        df["opt"] = df["X"].str.match(OPT_PREFIX_RE)
+        df["X"] = df["X"].str.replace(OPT_PREFIX_RE, "", regex=True)
+
+        # Order each (X, Y) alphabetically in one row-wise sort
+        pairs = list(map(tuple, np.sort(df[["X", "Y"]].to_numpy(), axis=1)))
         is_option = df["opt"].tolist()
 
         # Perform matching and collect results
@@ -75,27 +91,26 @@ def evaluation_experiment(model: str, dataset: str) -> None:
             syn_map
         )
 
-        all_unmatched.append(m_un + o_un)
+        # Both unmatched lists are joined once, for the counter and the metrics
+        all_un = m_un + o_un
+        unmatched_counter.update(all_un)
 
         mand_metrics = compute_metrics(m_matched, m_un, remaining_gold_man, round_idx)
-        all_metrics = compute_metrics(m_matched + o_matched, m_un + o_un, remaining_gold_all, round_idx)
+        all_metrics = compute_metrics(m_matched + o_matched, all_un, remaining_gold_all, round_idx)
 
-        full_log += f"\n\n=== Round {round_idx + 1} ({sheet_name}) ===\n" + log
+        log_parts.append(f"\n\n=== Round {round_idx + 1} ({sheet_name}) ===\n")
+        log_parts.append(log)
         mand_results.append(mand_metrics)
         all_results.append(all_metrics)
 
     # Write unmatched associations summary to Excel
-    flat_unmatched = [assoc for round_list in all_unmatched for assoc in round_list]
-    counter = Counter(flat_unmatched)
-    df_unmatched_log = pd.DataFrame({
-        'association': list(counter.keys()),
-        'count': list(counter.values())
-    })
-    df_unmatched_log.sort_values(by=["count"], ascending=False, inplace=True)
-    df_unmatched_log.to_excel(os.path.join(out_dir, "false_positives.xlsx"), index=False)
+    # most_common() is already ordered by descending count
+    write_counts_to_excel(
+        os.path.join(out_dir, "false_positives.xlsx"), "association", unmatched_counter.most_common()
+    )
 
     # Write experiment log and results
-    write_experiment_log(out_dir, full_log)
+    write_experiment_log(out_dir, "".join(log_parts))
     write_results_to_excel(out_dir, ds, mand_results, all_results)
 
 
@@ -7,7 +7,8 @@ import time
 
 from class_assoc_pipeline.utils.prompts import INSTRCTION_ASSOC_SLM, INSTRUCTIONS_ASSOC_LLM
 from class_assoc_pipeline.utils.model_client  import init_client
-from class_assoc_pipeline.utils.generation_utils import process_steps, get_next_round_number
+from class_assoc_pipeline.utils.generation_utils import process_steps, run_rounds
+from class_assoc_pipeline.utils.file_io import get_next_round_number
 from class_assoc_pipeline.config import GOLD_STANDARD_CLASS
 
 FIXED_MAX_TOKENS = 3000
@@ -21,6 +22,7 @@ def parse_args():
     parser.add_argument('--model', type=str, required=True, help='Model name')
     # parser.add_argument('--output', type=str, required=True, help='Output folder name')
     parser.add_argument('--rounds', type=int, default=1, help='Number of rounds (suggested max=5)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Rounds to run at the same time (default 1 = one after another)')
     args = parser.parse_args()
 
     valid_models = ["llama3-8b", "qwen-14b", "gpt-o1"]
@@ -68,7 +70,8 @@ def main():
         model = "o1-2024-12-17"
 
     # Run experiment rounds
-    for r in range(args.rounds):
+    # Round numbers are fixed up front, so concurrent rounds never share a file
+    def run_round(r):
         conversation, responses = process_steps(
             instructions=instruction,
             user_text=user_stories,
@@ -90,6 +93,8 @@ def main():
 
         print(f"✅ Round {r + 1} completed for {dataset_name}. The data is saved to {output_path}")
 
+    run_rounds(run_round, args.rounds, concurrency=args.concurrency)
+
     print("🎉 All rounds completed.")
 
 
@@ -1,5 +1,6 @@
 from class_assoc_pipeline.pipelines.association_pipeline.extraction import run_extraction_pipeline
 from class_assoc_pipeline.pipelines.association_pipeline.matching import run_evaluation_pipeline
+from class_assoc_pipeline.utils.file_io import count_files
 import argparse
 from pathlib import Path
 
@@ -11,6 +12,7 @@ def parse_args():
     # parser.add_argument('--model', type=str, required=True, help='Model name (llama3-8b, qwen-14b, gpt-o1, or all)')
     # parser.add_argument('--output', type=str, required=True, help='Output folder name')
     parser.add_argument('--mode', type=str, default="all", help="Pipeline mode (extraction, evaluation, all)")
+    parser.add_argument('--workers', type=int, default=None, help="Max parallel processes for extraction (default: one per CPU, 1 = serial)")
     args = parser.parse_args()
 
     # valid_models = ["llama3-8b", "qwen-14b", "gpt-o1", "all"]
@@ -34,18 +36,16 @@ def main():
     mode = args.mode
     in_dir = Path(args.input)
     # Get the number of files in the given dir, which is an important argument for the extraction task.
-    pattern = "*.txt"
-    existing_files = list(in_dir.glob(pattern))
-    total_number_files = len(existing_files)
+    total_number_files = count_files(in_dir, ".txt")
     # Get the dataset and model
     model, dataset = extract_model_and_dataset(in_dir)
 
     if mode == "extraction":
-        run_extraction_pipeline(model, dataset, rounds=total_number_files)
+        run_extraction_pipeline(model, dataset, rounds=total_number_files, workers=args.workers)
     elif mode == "evaluation":
         run_evaluation_pipeline(model, dataset, rounds=total_number_files)
     else:
-        run_extraction_pipeline(model, dataset, rounds=total_number_files)
+        run_extraction_pipeline(model, dataset, rounds=total_number_files, workers=args.workers)
         run_evaluation_pipeline(model, dataset, rounds=total_number_files)
 
 if __name__ == "__main__":
@@ -1,9 +1,7 @@
-import os
 import re
-import pandas as pd
 
 # Local imports from the project
-from .extractors import extract_content_by_model
+from .extractors import resolve_extractor
 from class_assoc_pipeline.utils.text_utils import (
     clean_class_name,
     format_optional_line,
@@ -13,7 +11,8 @@ from class_assoc_pipeline.utils.text_utils import (
     flatten_and_variants,
     flatten_comma_variants
 )
-from class_assoc_pipeline.utils.data_utils import deduplicate_list
+from class_assoc_pipeline.utils.file_io import read_utf8
+from class_assoc_pipeline.utils.parallel_utils import run_parallel
 
 from class_assoc_pipeline.config import (
      CLASS_INPUT_TEMPLATE,
@@ -22,152 +21,250 @@ from class_assoc_pipeline.config import (
 from class_assoc_pipeline.config import MODELS, DATASETS
 from pathlib import Path
 
-# Process one file for a given model, dataset, and round
-def process_file(model: str, dataset: str, exp_round: int) -> None:
+# Lines that only carry a rationale note are skipped while parsing class lists
+_RATIONALE_RE = re.compile(r'^(?:\d+\.\s*|\*\s*|\-\s*)?\s*Rationale:', re.IGNORECASE)
+# Numbered ("1.") or starred ("*") list entries; the match also spans the
+# bullet's trailing whitespace so the item text is simply ln[m.end():]
+_LIST_ITEM_RE = re.compile(r"^(?:\d+\.|\*)\s*")
+# Parenthetical notes, except the "(optional)", "(or ...)" and "(and ...)" markers
+_NOTE_PAREN_RE = re.compile(
+    r"""
+    (?!  # negative lookahead to protect "(optional)" etc.
+        \( \s* optional \) |
+        \( \s* or\b       |
+        \( \s* and\b
+    )
+    \([^)]*\)
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+# Word-bounded grouping words ("A and B", "A (or B)"); only run on entries
+# that already contain the bare substring
+_AND_WORD_RE = re.compile(r"\band\b", re.IGNORECASE)
+_OR_PAREN_RE = re.compile(r"\(or\b", re.IGNORECASE)
+# Leftover parentheses on a cleaned name (e.g., acronyms)
+_ACRONYM_RE = re.compile(r'\s*\([^)]*\)')
+
+def _classify_line(item: str) -> tuple[bool, list[str]]:
     """
-    Process a single raw text file by:
-      1. Extracting model-specific content (header removal).
-      2. Cleaning and separating mandatory and optional classes.
-      3. Deduplicating and saving results to text and Excel.
+    Turn one list item (bullet already removed) into its cleaned class name(s).
 
-    Paths are driven by config templates.
+    Returns (is_optional, names): explanatory notes are stripped and grouped
+    entries ("A, B", "A and B", "A (or B)") are split or flattened before
+    each name is normalised.
     """
-    # === 1. Build input/output paths ===
-    infile = CLASS_INPUT_TEMPLATE.format(model=model, dataset=dataset, round=exp_round)
-    out_dir = Path(CLASS_EXTRACTED_DIR.format(model=model, dataset=dataset))
-    out_dir.mkdir(parents=True, exist_ok=True)
-    outfile = os.path.join(out_dir, f"extracted_class_round{exp_round}.txt")
-    report  = os.path.join(out_dir, f"extracted_class.xlsx")
+    # Check if the line is marked optional
+    is_opt = "(optional)" in item.lower()
 
-    # === 2. Read file ===
-    try:
-        raw = open(infile, encoding="utf-8").read()
-    except FileNotFoundError:
-        print(f"❌ Error: '{infile}' not found.")
-        return
+    # Strip parenthetical notes unless they are special keywords
+    core = _NOTE_PAREN_RE.sub("", item).strip()
+    core = remove_trailing_notes(core)
 
-    # === 3. Extract relevant content (e.g., skip system headers) ===
-    extracted = extract_content_by_model(raw, model, exp_round)
-    if not extracted:
-        print(f"⚠️ No content extracted for round {exp_round}.")
-        return
+    # === 5. Handle variations in class grouping (comma > and > or) ===
+    # Plain substring tests decide most entries; the word-boundary regexes
+    # only confirm "and" / "(or" when the substring is actually there
+    lc = core.lower()
+    if "," in lc:
+        raw_names = flatten_comma_variants(core)
+    elif "and" in lc and _AND_WORD_RE.search(core):
+        raw_names = flatten_and_variants(core)
+    elif "/" in lc or ("(or" in lc and _OR_PAREN_RE.search(core)):
+        raw_names = [ flatten_or_variants(core) ]  # Single string
+    else:
+        raw_names = [ core ]
 
-    # === 4. Parse and clean lines ===
-    lines = extracted.splitlines()
+    # === 6. Final cleanup and classification ===
+    names = []
+    for raw in raw_names:
+        name = clean_class_name(raw)
+
+        # Strip parentheses not related to meaning (e.g., acronyms)
+        if not ('(optional)' in name.lower()) and ('(' in name):
+            name = _ACRONYM_RE.sub('', name).strip()
+        names.append(name)
+
+    return is_opt, names
+
+def _parse_lines(lines: list[str]) -> tuple[list[str], list[str]]:
+    """
+    Split extracted list lines into (mandatory, optional) class names; after
+    the first blank line only "(optional)"-tagged items are kept.
+    """
     mandatory, optional = [], []
     reading_mand = True  # Tracks when optional section starts
 
+    item_match = _LIST_ITEM_RE.match
+    rationale_match = _RATIONALE_RE.match
+    classify = _classify_line
+    mand_extend = mandatory.extend
+    opt_extend = optional.extend
+
     for ln in lines:
         text = ln.strip()
 
-        # Skip rationale sections (often not part of actual class lists)
-        if re.match(r'^(?:\d+\.\s*|\*\s*|\-\s*)?\s*Rationale:', text, re.IGNORECASE):
-            # print(f"{text}, Match")
-            continue
-
         # Detect transition between mandatory and optional sections
-        if reading_mand and text == "":
+        if not text:
             reading_mand = False
             continue
 
         # Only process properly formatted list items
-        if not re.match(r"^(?:\d+\.|\*)", ln):
+        m = item_match(ln)
+        if not m:
             continue
 
-        # Remove list numbering or bullets
-        item = re.sub(r"^(?:\d+\.\s*|\*\s*|\-\s*)", "", ln)
-
-        # Check if the line is marked optional
-        is_opt = "(optional)" in item.lower()
-
-        # Strip parenthetical notes unless they are special keywords
-        core = re.sub(
-            r"""
-            (?!  # negative lookahead to protect "(optional)" etc.
-                \( \s* optional \) |
-                \( \s* or\b       |
-                \( \s* and\b
-            )
-            \([^)]*\)
-            """,
-            "",
-            item,
-            flags=re.IGNORECASE|re.VERBOSE
-        ).strip()
-        core = remove_trailing_notes(core)
-
-        # === 5. Handle variations in class grouping (comma, and, or) ===
-        if ',' in core:
-            raw_names = flatten_comma_variants(core)
-            # print(raw_names)
-        elif re.search(r'\band\b', core, flags=re.IGNORECASE):
-            raw_names = flatten_and_variants(core)
-            # print(raw_names)
-        elif re.search(r'\(or\b', core, flags=re.IGNORECASE) or '/' in core:
-            raw_names = [ flatten_or_variants(core) ]  # Single string
+        # Past the mandatory block only optional-tagged items are kept
+        if not reading_mand and "(optional)" not in ln.lower():
+            continue
+
+        # Skip rationale sections (often not part of actual class lists)
+        if rationale_match(text):
+            continue
+
+        is_opt, names = classify(ln[m.end():])
+
+        # Append to appropriate list (mandatory/optional)
+        if is_opt:
+            opt_extend(map(format_optional_line, names))
         else:
-            raw_names = [ core ]
-
-        # === 6. Final cleanup and classification ===
-        for raw in raw_names:
-            name = clean_class_name(raw)
-
-            # Strip parentheses not related to meaning (e.g., acronyms)
-            if not ('(optional)' in name.lower()) and ('(' in name):
-                # print(f"before name: {name}")
-                name = re.sub(r'\s*\([^)]*\)', '', name).strip()
-                # print(f"after name: {name}")
-
-            # Append to appropriate list (mandatory/optional)
-            if reading_mand:
-                if is_opt:
-                    optional.append(format_optional_line(name))
-                else:
-                    mandatory.append(name)
-            else:
-                if is_opt:
-                    optional.append(format_optional_line(name))
+            mand_extend(names)
 
-    # === 7. Deduplicate and combine ===
-    mandatory = deduplicate_list(mandatory)
-    optional  = deduplicate_list(optional)
-    combined  = dedupe_preserve_optional_first(mandatory, optional)
-    notes = [""] * len(combined)
+    return mandatory, optional
 
-    # Ensure output directory
-    os.makedirs(out_dir, exist_ok=True)
+# Process one file for a given model, dataset, and round
+def process_file(model: str, dataset: str, exp_round: int, out_dir: Path,
+                 extractor=None, reuse: bool = False) -> list[str] | None:
+    """
+    Process a single raw text file by:
+      1. Extracting model-specific content (header removal).
+      2. Cleaning and separating mandatory and optional classes.
+      3. Deduplicating and saving results to text.
+
+    Returns the round's combined class list for the Excel report, or None
+    when nothing could be extracted. The input path is driven by the
+    config template; out_dir is the dataset's (already created) output folder
+    and extractor the model's content extractor (resolved here if omitted).
+    With reuse set, a round whose .txt output is newer than its log is
+    reloaded from that file instead of being parsed again. This is opt-in
+    because the check cannot see changes to the parsing code itself.
+    """
+    # === 1. Build input/output paths ===
+    infile = CLASS_INPUT_TEMPLATE.format(model=model, dataset=dataset, round=exp_round)
+    outfile = out_dir / f"extracted_class_round{exp_round}.txt"
+
+    # Reuse the previous output when asked and the log has not changed since
+    if reuse:
+        try:
+            up_to_date = outfile.stat().st_mtime > Path(infile).stat().st_mtime
+        except OSError:
+            up_to_date = False
+        if up_to_date:
+            text = outfile.read_text(encoding="utf-8")
+            print(f"⏭️ Skipped {model} | {dataset} | Round {exp_round}. {outfile} is up to date")
+            return text.split("\n") if text else []
+
+    # === 2. Read file (single unbuffered read, decoded once) ===
+    try:
+        raw = read_utf8(infile)
+    except FileNotFoundError:
+        print(f"❌ Error: '{infile}' not found.")
+        return None
+
+    # === 3. Extract relevant content (e.g., skip system headers) ===
+    if extractor is None:
+        extractor = resolve_extractor(model)
+    extracted = extractor(raw, exp_round)
+    # The extracted section is its own string; drop the full log before the
+    # lines are built so both are not held at once
+    del raw
+    if not extracted:
+        print(f"⚠️ No content extracted for round {exp_round}.")
+        return None
+
+    # === 4. Parse and clean lines ===
+    # splitlines() (not a file-style line iterator) on purpose: logs use
+    # U+2028 separators between a class and its explanation
+    lines = extracted.splitlines()
+    del extracted
+    mandatory, optional = _parse_lines(lines)
+
+    # === 7. Deduplicate and combine ===
+    # One pass: its case-insensitive, optional-tag-blind key already covers
+    # duplicates inside each list as well as across them.
+    combined = dedupe_preserve_optional_first(mandatory, optional)
 
     # === 8. Save as plain text ===
     with open(outfile, "w", encoding="utf-8") as f:
         f.write("\n".join(combined))
 
-    # === 9. Save as Excel (with notes column) ===
-    df = pd.DataFrame({"class": combined, "note": notes})
-    df["class"] = df["class"].astype(str)
-    df = df[~df['class'].str.lower().duplicated()].reset_index(drop=True)
-
-    sheet_name  = f"Round{exp_round}"
-    if not os.path.exists(report):
-        with pd.ExcelWriter(report, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name=sheet_name)
-    else:
-        with pd.ExcelWriter(report, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-            df.to_excel(writer, index=False, sheet_name=sheet_name)
-
-    print(f"✅ Extracted {model} | {dataset} | Round {exp_round}. Data saved to {outfile} and {report}")
+    print(f"✅ Extracted {model} | {dataset} | Round {exp_round}. Data saved to {outfile}")
+    return combined
 
 # === Helper: Loop through all rounds for a dataset ===
-def process_dataset(model: str, dataset: str, rounds: int) -> None:
+def process_dataset(model: str, dataset: str, rounds: int, reuse: bool = False,
+                    workers: int | None = None, extractor=None) -> None:
     """
-    Loop over rounds for one dataset, using config-driven paths.
+    Process all rounds for one dataset, using config-driven paths.
+    extractor is the model's content extractor (resolved here if omitted).
+
+    Rounds run in parallel worker processes (workers caps the pool, default
+    one per CPU, and it never exceeds the number of rounds; a pool of 1 or
+    less parses them serially in this process); their class
+    lists are collected and the Excel report is written in a single pass by
+    the parent.
     """
-    for r in range(1, rounds + 1):
-        process_file(model, dataset, r)
+    # Output folder is resolved and created once for all rounds
+    out_dir = Path(CLASS_EXTRACTED_DIR.format(model=model, dataset=dataset))
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # The model's extractor is the same for every round
+    if extractor is None:
+        extractor = resolve_extractor(model)
+
+    # Rounds are independent (own input, own .txt output), so they are parsed
+    # in worker processes; results come back in round order.
+    round_ids = range(1, rounds + 1)
+    results = run_parallel(
+        process_file,
+        ((model, dataset, r, out_dir, extractor, reuse) for r in round_ids),
+        workers,
+    )
+
+    sheets = {}
+    for r, combined in zip(round_ids, results):
+        if combined is not None:
+            sheets[f"Round{r}"] = combined
+
+    if not sheets:
+        return
+
+    # The sheets are a plain "class" column plus an empty "note" column for
+    # annotators, so cells are written straight into the workbook instead of
+    # going through a DataFrame per round. The writer is imported here so the
+    # parsing path (and every worker process) stays free of Excel dependencies.
+    import xlsxwriter
+
+    report = out_dir / "extracted_class.xlsx"
+    # Always a fresh file, so rows can be streamed in constant-memory mode
+    workbook = xlsxwriter.Workbook(report, {"constant_memory": True, "strings_to_urls": False})
+    header_fmt = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    for sheet_name, combined in sheets.items():
+        ws = workbook.add_worksheet(sheet_name)
+        ws.write_row(0, 0, ["class", "note"], header_fmt)
+        # Notes start out empty, and blank cells are the default
+        for i, name in enumerate(combined, start=1):
+            ws.write_string(i, 0, name)
+    workbook.close()
+    print(f"Report is saved to {report}")
 
 # === Public entry point ===
-def run_extraction_pipeline(model: str, dataset: str, rounds: int):
+def run_extraction_pipeline(model: str, dataset: str, rounds: int, reuse: bool = False,
+                            workers: int | None = None):
     """
     Public interface to run the whole extraction pipeline.
+    Set reuse to keep rounds whose extracted output is newer than their log,
+    and workers to bound the number of round-parsing processes.
     """
     print(f"🔍 Extracting Class Conversation Log for {model} | {dataset.capitalize()} | {rounds} rounds")
-    process_dataset(model, dataset, rounds)
+    # Resolved once up front; unsupported models fall back to the raw log
+    extractor = resolve_extractor(model)
+    process_dataset(model, dataset, rounds, reuse, workers, extractor)
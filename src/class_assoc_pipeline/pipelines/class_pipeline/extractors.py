@@ -1,80 +1,123 @@
+import logging
 import re
+from itertools import islice
+
+# Per-round tracing is debug-only; content slices are formatted lazily
+logger = logging.getLogger(__name__)
+
+# Conversation turn markers; only the Nth occurrence is ever needed. They are
+# literals, so they are located with str.find; the compiled forms are the
+# fallback for text whose lowercase form has a different length.
+_GPT_O1_RE = re.compile(r'GPT-o1', re.IGNORECASE)
+_ASSISTANT_RE = re.compile(r'Assistant :', re.IGNORECASE)
+_THINK_RE = re.compile(r'</think>', re.IGNORECASE)
+
+# Section headers in front of the final class list, compiled once per process.
+# GPT-o1: the step-3 header, then the final list header (or, failing that, a
+# "Numbered Format" line). No groups are read back and a trailing lazy ".*?"
+# always matched empty, so the step-3 pattern is non-capturing and ends at
+# the header keyword.
+_GPT_STEP3_RE = re.compile(
+    r"step\s*3\s*:\s*.*?final\s+(?:refined\s+)?(?:class(?:es)?|list(?:\s+of\s+classes)?|list of class candidates)",
+    re.IGNORECASE,
+)
+_GPT_FINAL_RE = re.compile(
+    r'final\s+(refined list of class candidates|list of class candidates|list of classes|list|class(?:es)?)[\s:]*',
+    re.IGNORECASE,
+)
+_GPT_NUMBERED_RE = re.compile(r"(?:.*\d+\.\d+)?\s*Numbered Format.*")
+_LLAMA_FINAL_RE = re.compile(
+    r'(Here is the final list of classes:|#+\s*Final Class List|#+\s*Refined List of Classes|Here is the final class list in a structured format:)',
+    re.IGNORECASE,
+)
+_QWEN_FINAL_RE = re.compile(
+    r'(Here is the final list of classes:|#+\s*Final Class List|#+\s*Refined List of Classes)',
+    re.IGNORECASE,
+)
+
+
+def _nth_marker_end(content: str, needle: str, marker_re: re.Pattern, n: int) -> int | None:
+    """
+    Offset just past the n-th (1-based) case-insensitive occurrence of the
+    lowercase literal needle in content, or None if there are fewer than n.
+    """
+    low = content.lower()
+    if len(low) != len(content):
+        # Lowering changed some characters' width, so offsets would drift
+        m = next(islice(marker_re.finditer(content), n - 1, n), None)
+        return m.end() if m else None
+    end = 0
+    for _ in range(n):
+        start = low.find(needle, end)
+        if start == -1:
+            return None
+        end = start + len(needle)
+    return end
+
 
 def extract_gpt_o1_content(content: str, exp_round: int) -> str:
-    header_pattern = r'GPT-o1'
-    header_match = list(re.finditer(header_pattern, content, re.IGNORECASE))
-    if len(header_match) < 2:
+    # Stop scanning at the second header instead of collecting every match
+    second_end = _nth_marker_end(content, "gpt-o1", _GPT_O1_RE, 2)
+    if second_end is None:
         print("⚠️ Could not find the second occurrence of GPT-o1")
         return ""
-    second_match = header_match[1]
-    content = content[second_match.end():].strip()
+    content = content[second_end:].strip()
 
-    header_pattern2 = r"step\s*3\s*:\s*.*?(final\s+(refined\s+)?(class(?:es)?|list(?:\s+of\s+classes)?|list of class candidates)).*?"
-    header_match2 = re.search(header_pattern2, content, re.IGNORECASE)
+    header_match2 = _GPT_STEP3_RE.search(content)
     if not header_match2:
         print(f"⚠️ Warning: Could not locate the start of the first header in round {exp_round}.")
         return ""
     content = content[header_match2.end():].strip()
-    # print(f"[Round {exp_round}] After header_pattern2 extraction, content begins with:\n{content[:300]}\n")
-    print(f"[Round {exp_round}]")
+    logger.debug("[Round %d] After header_pattern2 extraction, content begins with:\n%.300s\n", exp_round, content)
 
-    header_pattern3 = r'final\s+(refined list of class candidates|list of class candidates|list of classes|list|class(?:es)?)[\s:]*'
-    header_match3 = re.search(header_pattern3, content, re.IGNORECASE)
+    header_match3 = _GPT_FINAL_RE.search(content)
     if exp_round == 1:
-        print(f"[Round {exp_round}] header_match3 (direct matching): {header_match3}")
+        logger.debug("[Round %d] header_match3 (direct matching): %s", exp_round, header_match3)
     if not header_match3:
         print(f"⚠️ Direct matching for header_pattern3 failed in round {exp_round}.")
-        print(f"[Round {exp_round}] Content for header_pattern3 matching:\n{content[:300]}\n")
-        fallback_pattern = r"(?:.*\d+\.\d+)?\s*Numbered Format.*"
-        header_match3 = re.search(fallback_pattern, content)
+        logger.debug("[Round %d] Content for header_pattern3 matching:\n%.300s\n", exp_round, content)
+        header_match3 = _GPT_NUMBERED_RE.search(content)
         if header_match3:
             print(f"🔍 Found a line matching 'Numbered Format' pattern in round {exp_round}.")
         else:
-            print(f"⚠️ Warning: Could not locate the start of the second header in round {exp_round}\n{content[:300]}\n .")
+            # The content excerpt is already logged at debug level above
+            print(f"⚠️ Warning: Could not locate the start of the second header in round {exp_round}.")
             return ""
     else:
-        print(f"[Round {exp_round}] Found header_pattern3 match at index: {header_match3.start()} to {header_match3.end()}")
+        logger.debug("[Round %d] Found header_pattern3 match at index: %d to %d",
+                     exp_round, header_match3.start(), header_match3.end())
     
     extracted = content[header_match3.end():].strip()
-    # print(f"[Round {exp_round}] Extracted content begins with:\n{extracted[:300]}\n")
-    print(f"[Round {exp_round}]")
+    logger.debug("[Round %d] Extracted content begins with:\n%.300s\n", exp_round, extracted)
     return extracted
 
 
 def extract_llama3_8b_content(content: str, exp_round: int) -> str:
-    header_pattern = r'Assistant :'
-    header_match = list(re.finditer(header_pattern, content, re.IGNORECASE))
-    if len(header_match) < 3:
+    start_index = _nth_marker_end(content, "assistant :", _ASSISTANT_RE, 3)
+    if start_index is None:
         print("⚠️ Could not find three occurrences of Assistant")
         return ""
-    start_index = header_match[2]
-    content = content[start_index.end():].strip()
-    header_pattern2 = r'(Here is the final list of classes:|#+\s*Final Class List|#+\s*Refined List of Classes|Here is the final class list in a structured format:)'
-    header_match2 = re.search(header_pattern2, content, re.IGNORECASE)
+    content = content[start_index:].strip()
+    header_match2 = _LLAMA_FINAL_RE.search(content)
     if not header_match2:
         print(f"⚠️ Warning: Could not locate the secondary header in round {exp_round} using Llama pattern.")
         return ""
     return content[header_match2.end():].strip()
 
 def extract_qwen14b_content(content: str, exp_round: int) -> str:
-    header_pattern = r'Assistant :'
-    header_match = list(re.finditer(header_pattern, content, re.IGNORECASE))
-    if len(header_match) < 3:
+    start_index = _nth_marker_end(content, "assistant :", _ASSISTANT_RE, 3)
+    if start_index is None:
         print("⚠️ Could not find three occurrences of Assistant")
         return ""
-    start_index = header_match[2]
-    content = content[start_index.end():].strip()
+    content = content[start_index:].strip()
 
-    header_pattern2 = r"</think>"
-    header_match2 = re.search(header_pattern2, content, re.IGNORECASE)
-    if not header_match2:
+    think_end = _nth_marker_end(content, "</think>", _THINK_RE, 1)
+    if think_end is None:
         print(f"⚠️ Warning: Could not locate the </think> header using Qwen pattern in round {exp_round}.")
         return ""
-    content = content[header_match2.end():].strip()
+    content = content[think_end:].strip()
 
-    header_pattern3 = r'(Here is the final list of classes:|#+\s*Final Class List|#+\s*Refined List of Classes)'
-    
-    header_match3 = re.search(header_pattern3, content, re.IGNORECASE)
+    header_match3 = _QWEN_FINAL_RE.search(content)
     if not header_match3:
         print(f"⚠️ Warning: Could not locate the third header in round {exp_round} using Qwen pattern.")
         return ""
@@ -86,9 +129,19 @@ EXTRACTORS = {
     "qwen-14b": extract_qwen14b_content,
 }
 
-def extract_content_by_model(content: str, model: str, exp_round: int) -> str:
+def _passthrough(content: str, exp_round: int) -> str:
+    return content
+
+def resolve_extractor(model: str):
+    """
+    Look up the content extractor for a model once, so callers looping over
+    rounds skip the per-call dispatch. Unsupported models get the raw content.
+    """
     fn = EXTRACTORS.get(model.lower())
     if not fn:
         print(f"⚠️ Unsupported model '{model}'")
-        return content
-    return fn(content, exp_round)
+        return _passthrough
+    return fn
+
+def extract_content_by_model(content: str, model: str, exp_round: int) -> str:
+    return resolve_extractor(model)(content, exp_round)
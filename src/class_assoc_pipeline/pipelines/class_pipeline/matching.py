@@ -1,9 +1,9 @@
 
 import os
 from pathlib import Path
-import pandas as pd
 from collections import Counter
 import re
+from functools import lru_cache
 
 from class_assoc_pipeline.config import (
     CLASS_EXTRACTED_DIR,
@@ -15,11 +15,13 @@ from class_assoc_pipeline.config import (
 from ...utils.file_io import (
     load_excel_sheets,
     write_results_to_excel,
-    write_experiment_log
+    write_experiment_log,
+    write_counts_to_excel,
 )
 from class_assoc_pipeline.utils.data_utils import (
     normalize_word,
     expand_synonym_mapping,
+    synonym_expander,
 )
 from class_assoc_pipeline.utils.metrics import (
     perform_matching,
@@ -27,6 +29,47 @@ from class_assoc_pipeline.utils.metrics import (
     remove_non_punished_from_unmatched
 )
 
+# Sheet cells: optional "(opt)" / "(optional)" tag, then the class name
+_CLASS_CELL_RE = re.compile(r"^(?:\((?P<opt>opt|optional)\)\s*)?(?P<body>.*)$", re.IGNORECASE | re.DOTALL)
+# Parenthetical notes dropped from a class name before matching
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
+
+def _strip_opt_tag(entity: str) -> str:
+    """
+    Drop a leading "(opt)" tag (any case) and surrounding whitespace from an
+    unmatched class before it is counted; a prefix compare, not a regex.
+    """
+    if entity[:5].lower() == "(opt)":
+        entity = entity[5:]
+    return entity.strip()
+
+
+def _split_class(cell) -> tuple[bool, str]:
+    """
+    One pass over a sheet cell: returns (is_optional, match key), where the
+    key is the class name without its optional tag and parenthetical notes,
+    run through normalize_word. Non-string cells give (False, "").
+    """
+    if not isinstance(cell, str):
+        return False, ""
+    m = _CLASS_CELL_RE.match(cell)
+    return m["opt"] is not None, normalize_word(_PAREN_RE.sub("", m["body"]).strip())
+
+
+@lru_cache(maxsize=None)
+def _prep_standards(gold_raw: tuple, silver_raw: tuple, synonyms: tuple):
+    """
+    Normalized gold/silver class sets and the synonym expander for one
+    dataset. The raw entries are passed as tuples so the result can be cached;
+    it is returned frozen because the cached objects are shared by every call.
+    """
+    gold_set = frozenset(normalize_word(x) for x in gold_raw)
+    silver_set = frozenset(normalize_word(x) for x in silver_raw)
+    syn_map = synonym_expander(expand_synonym_mapping(dict(synonyms)))
+    return gold_set, silver_set, syn_map
+
+
 def evaluation_experiment(
     model: str,
     dataset: str,
@@ -44,9 +87,11 @@ def evaluation_experiment(
     """
     # — prepare standards & synonyms —
     dataset_key = dataset.lower()
-    gold_standard   = { normalize_word(x) for x in gold_standard_dict[dataset_key] }
-    silver_standard = { normalize_word(x) for x in silver_standard_dict.get(dataset_key, []) }
-    synonym_mapping = expand_synonym_mapping(synonym_dict[dataset_key])
+    gold_standard, silver_standard, synonym_mapping = _prep_standards(
+        tuple(gold_standard_dict[dataset_key]),
+        tuple(silver_standard_dict.get(dataset_key, [])),
+        tuple((std, tuple(syns)) for std, syns in synonym_dict[dataset_key].items()),
+    )
     # — I/O paths —
     out_dir = Path(CLASS_EXTRACTED_DIR.format(model=model, dataset=dataset_key))
     in_path = out_dir / f"extracted_class.xlsx"
@@ -56,28 +101,19 @@ def evaluation_experiment(
     # load all rounds
     sheets = load_excel_sheets(in_path)
 
-    full_log = ""
+    log_parts = []  # joined once after the last round
     mand_results = []
     all_results  = []
-    all_unmatched_class = []
+    unmatched_counter = Counter()  # false positives across all rounds
 
     for round_idx, (sheet_name, df_raw) in enumerate(sheets.items()):
         print(f"✅ Evaluated {model} | {dataset} | Round {round_idx + 1}")
 
-        df = df_raw.dropna(subset=["class"]).copy()
-        df["is_opt"] = df["class"].str.contains(r"^\((?:opt|optional)\)", case=False)
-        df["class_clean"] = df["class"].str.replace(
-            r"(?i)^\((?:opt|optional)\)\s*", "", regex=True
-        )
-        df["class_for_match"] = (
-            df["class_clean"]
-              .str.replace(r"\([^)]*\)", "", regex=True)
-              .str.strip()
-              .map(normalize_word)
-        )
-
-        words       = df["class_for_match"].tolist()
-        is_opts     = df["is_opt"].tolist()
+        # Only the class column is used: each cell is split into its optional
+        # flag and match key in one pass, with no intermediate Series
+        split = [_split_class(cell) for cell in df_raw["class"].dropna().tolist()]
+        is_opts = [opt for opt, _ in split]
+        words = [word for _, word in split]
 
         # run the two‐phase matching
         m_matched, o_matched, m_un, o_un, log, remaining_gold_man, remaining_gold_all = perform_matching(
@@ -90,40 +126,31 @@ def evaluation_experiment(
                                                                dataset,
                                                                log)
         
+        # Combined lists are built once and shared by pruning and metrics
+        all_matched = m_matched + o_matched
         updated_all_un, log = remove_non_punished_from_unmatched(m_un + o_un,
-                                                                 m_matched + o_matched,
+                                                                 all_matched,
                                                                  non_punish_dict,
                                                                  dataset,
                                                                  log)
 
         mand_metrics = compute_metrics(m_matched, updated_m_un, remaining_gold_man, round_idx)
-        all_metrics  = compute_metrics(m_matched+o_matched, updated_all_un, remaining_gold_all, round_idx)
+        all_metrics  = compute_metrics(all_matched, updated_all_un, remaining_gold_all, round_idx)
 
         mand_results.append(mand_metrics)
         all_results .append(all_metrics)
 
-        full_log += f"\n\n=== Round {round_idx + 1} ({sheet_name}) ===\n" + log
-
-        # deal with unmathed list
-        all_unmatched_class.append(updated_all_un)
+        log_parts.append(f"\n\n=== Round {round_idx + 1} ({sheet_name}) ===\n")
+        log_parts.append(log)
 
-    # Clean unmatched classes
-    all_unmatched_log_flat = [
-        re.sub(r'^\(opt\)', '', entity, flags=re.IGNORECASE).strip() 
-        for round in all_unmatched_class 
-        for entity in round
-    ]
-    class_counter = Counter(all_unmatched_log_flat)
-    df_unmatched_class = pd.DataFrame({
-        'class': list(class_counter.keys()),
-        'count': list(class_counter.values())
-    })
+        # deal with unmathed list: count each class without its "(opt)" tag
+        unmatched_counter.update(map(_strip_opt_tag, updated_all_un))
 
-    df_unmatched_class.sort_values(by='count', ascending=False, inplace=True)
-    df_unmatched_class.to_excel(unmatched_output_path, index=False)
+    # most_common() is already ordered by descending count
+    write_counts_to_excel(unmatched_output_path, "class", unmatched_counter.most_common())
 
     # write logs and results
-    write_experiment_log(out_dir, full_log)
+    write_experiment_log(out_dir, "".join(log_parts))
     write_results_to_excel(out_dir, dataset_key, mand_results, all_results)
 
 
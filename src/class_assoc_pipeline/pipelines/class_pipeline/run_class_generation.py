@@ -1,11 +1,11 @@
 import argparse
 from pathlib import Path
 from datetime import datetime
-import time
 
 from class_assoc_pipeline.utils.prompts import INSTRUCTIONS_CLASS_SLM, INSTRUCTIONS_CLASS_LLM
 from class_assoc_pipeline.utils.model_client  import init_client
-from class_assoc_pipeline.utils.generation_utils import process_steps, get_next_round_number
+from class_assoc_pipeline.utils.generation_utils import process_steps, run_rounds
+from class_assoc_pipeline.utils.file_io import get_next_round_number
 
 FIXED_MAX_TOKENS = 3000  # Cap on token size to avoid runaway completions
 
@@ -17,6 +17,7 @@ def parse_args():
     parser.add_argument('--input', type=str, required=True, help='Input file path')
     parser.add_argument('--model', type=str, required=True, help='Model name')
     parser.add_argument('--rounds', type=int, default=1, help='Number of rounds (suggested max=5)')
+    parser.add_argument('--concurrency', type=int, default=1, help='Rounds to run at the same time (default 1 = one after another)')
     args = parser.parse_args()
 
     # Ensure model is supported
@@ -60,7 +61,8 @@ def main():
         model = "o1-2024-12-17"
 
     # --- Run class identification for N rounds ---
-    for r in range(args.rounds):
+    # Round numbers are fixed up front, so concurrent rounds never share a file
+    def run_round(r):
         conversation, responses = process_steps(
             instructions=instruction,
             user_text=user_stories,
@@ -79,7 +81,9 @@ def main():
                 out_file.write(f"{msg['role'].upper()} :\n\n{msg['content']}\n\n")
 
         print(f"✅ Round {r + 1} completed for {dataset_name}. The data is saved to {output_path}")
-        time.sleep(1)  # Prevent API flooding
+
+    # Serial rounds pause 1s between calls to prevent API flooding
+    run_rounds(run_round, args.rounds, concurrency=args.concurrency, delay=1)
 
     print("🎉 All rounds completed.")
 
@@ -1,5 +1,6 @@
 from class_assoc_pipeline.pipelines.class_pipeline.extraction import run_extraction_pipeline
 from class_assoc_pipeline.pipelines.class_pipeline.matching import run_evaluation_pipeline
+from class_assoc_pipeline.utils.file_io import count_files
 import argparse
 from pathlib import Path
 
@@ -10,6 +11,8 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Run class identification")
     parser.add_argument('--input', type=str, required=True, help='Input folder')
     parser.add_argument('--mode', type=str, default="all", help="Pipeline mode (extraction, evaluation, all)")
+    parser.add_argument('--reuse', action='store_true', help="Reuse extracted rounds whose output is newer than their log (default: re-extract all)")
+    parser.add_argument('--workers', type=int, default=None, help="Max parallel processes for extraction (default: one per CPU, 1 = serial)")
     args = parser.parse_args()
 
     valid_modes = ["evaluation", "extraction", "all"]
@@ -34,9 +37,7 @@ def main():
     in_dir = Path(args.input)
 
     # Count how many R*.txt files exist — used to determine number of rounds
-    pattern = "*.txt"
-    existing_files = list(in_dir.glob(pattern))
-    total_number_files = len(existing_files)
+    total_number_files = count_files(in_dir, ".txt")
     print(total_number_files)
 
     # Infer model and dataset from folder structure
@@ -44,11 +45,11 @@ def main():
 
     # Pipeline dispatch based on mode
     if mode == "extraction":
-        run_extraction_pipeline(model, dataset, rounds=total_number_files)
+        run_extraction_pipeline(model, dataset, rounds=total_number_files, reuse=args.reuse, workers=args.workers)
     elif mode == "evaluation":
         run_evaluation_pipeline(model, dataset, rounds=total_number_files)
     else:
-        run_extraction_pipeline(model, dataset, rounds=total_number_files)
+        run_extraction_pipeline(model, dataset, rounds=total_number_files, reuse=args.reuse, workers=args.workers)
         run_evaluation_pipeline(model, dataset, rounds=total_number_files)
 
 if __name__ == "__main__":
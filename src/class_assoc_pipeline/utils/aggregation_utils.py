@@ -2,15 +2,54 @@ import os
 from typing import List
 import pandas as pd
 import ast
+from functools import lru_cache
 
+from class_assoc_pipeline.utils.file_io import list_dataset_dirs, excel_read_engine
 
-def normalize_association_key(raw: str | tuple) -> tuple:
-    if isinstance(raw, str):
+
+def _split_quoted_pair(raw: str) -> tuple | None:
+    """
+    Fast path for the usual "('x', 'y')" keys (str() of a 2-tuple of plain
+    strings). Returns None for anything else, including items that contain
+    quotes, backslashes or commas, which are left to ast.literal_eval.
+    """
+    s = raw.strip()
+    if not (s.startswith("(") and s.endswith(")")):
+        return None
+    parts = s[1:-1].split(",")
+    if len(parts) != 2:
+        return None
+    items = []
+    for part in parts:
+        part = part.strip()
+        if len(part) < 2 or part[0] not in "'\"" or part[-1] != part[0]:
+            return None
+        body = part[1:-1]
+        if "'" in body or '"' in body or "\\" in body:
+            return None
+        items.append(body)
+    return tuple(items)
+
+
+@lru_cache(maxsize=None)
+def _parse_association_key(raw: str) -> tuple:
+    """
+    Sorted, lowercased tuple for a stringified association key; each distinct
+    string is parsed once.
+    """
+    parsed = _split_quoted_pair(raw)
+    if parsed is None:
         try:
-            raw = ast.literal_eval(raw)  # safely convert string to tuple
+            parsed = ast.literal_eval(raw)  # safely convert string to tuple
         except Exception as e:
             print(f"⚠️ Could not parse: {raw} — {e}")
             return ("INVALID",)  # or raise
+    return tuple(sorted([x.strip().lower() for x in parsed]))
+
+
+def normalize_association_key(raw: str | tuple) -> tuple:
+    if isinstance(raw, str):
+        return _parse_association_key(raw)
 
     return tuple(sorted([x.strip().lower() for x in raw]))
 
@@ -43,42 +82,43 @@ def aggregate_unmatched_results(
     first_model = models[0]
     first_base = f"output/{experiment_type.lower()}/{first_model}"
     # first_base now = "output/GPT-o1/Extracted_Class_Experiment/"
-    datasets = [d for d in os.listdir(first_base) if not d.startswith(".")]
+    datasets = list_dataset_dirs(first_base)
 
     # Prepare output folder
     agg_dir = os.path.join(output_root, et)
     os.makedirs(agg_dir, exist_ok=True)
 
     for dataset in datasets:
-        df_ind = pd.DataFrame()
+        # One count column per model, keyed by class/association
+        parts = []
         for model in models:
             rel_path = template.format(model=model, dataset=dataset)
             full_path = os.path.join(base_dir, rel_path)
-            df = pd.read_excel(full_path)
+            df = pd.read_excel(full_path, engine=excel_read_engine())
             if key_col == "association":
                 df[key_col] = df[key_col].apply(normalize_association_key)
-            # rename count column
-            count_col = f"count_{model}"
-            df = df.rename(columns={"count": count_col, key_col: key_col})
-            # join side-by-side
-            if df_ind.empty:
-                df_ind = df.set_index(key_col)[[count_col]]
-            else:
-                df_ind = df_ind.join(df.set_index(key_col)[count_col], how="outer")
+            counts = df.set_index(key_col)["count"].rename(f"count_{model}")
+            if not counts.index.is_unique:
+                # Keys that normalize to the same value are counted together
+                counts = counts.groupby(level=0, sort=False).sum()
+            parts.append(counts)
 
+        # Side-by-side per-model counts in one outer concat (sorted by key,
+        # as the former chain of outer joins produced)
+        df_ind = pd.concat(parts, axis=1, join="outer", sort=True)
+        df_ind.index.name = key_col
         df_all = df_ind.reset_index()
-        # melt + sum to get aggregated totals
+        # Row-wise total across models (missing counts are skipped)
         df_agg = (
-            df_all
-            .melt(id_vars=[key_col], var_name="model", value_name="count")
-            .groupby(key_col, as_index=False)["count"]
-            .sum()
-            .sort_values("count", ascending=False)
-            .rename(columns={"count": "total_count"})
+            df_ind
+            .sum(axis=1)
+            .sort_values(ascending=False)
+            .rename("total_count")
+            .reset_index()
         )
 
         out_path = os.path.join(agg_dir, f"{dataset}_unmatched.xlsx")
-        with pd.ExcelWriter(out_path, engine="openpyxl", mode="w") as writer:
+        with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
             df_agg.to_excel(writer, sheet_name="Aggregated Result", index=False)
             df_all.to_excel(writer, sheet_name="Individual Result", index=False)
 
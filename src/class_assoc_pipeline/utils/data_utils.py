@@ -1,96 +1,126 @@
 import re
+from functools import lru_cache
+from typing import Callable
+
 import inflect
 
 # Initialize inflect engine for singularization
 _p = inflect.engine()
 
+# "(opt)" / "(optional)" tag at the start of an association's left-hand class
+OPT_PREFIX_RE = re.compile(r"^\(opt(?:ional)?\)\s*", re.IGNORECASE)
+
+
+# Keywords to preserve as-is (built once, not on every call)
+_KEYWORDS = frozenset({
+    "class",
+    "process",
+    "progress",
+    "academic progress",
+    "address",
+    "delivery address",
+    "deliveryaddresnormalize_word",
+    "status",
+    "order status",
+    "business",
+    "scheduling process",
+    "payment process",
+    "hiring process",
+})
+
+
+@lru_cache(maxsize=100_000)
+def _normalize_str(word: str) -> str:
+    lowered = word.lower().strip()
+    if lowered in _KEYWORDS:
+        return lowered
+    # Attempt singularization; fallback to original lowercase
+    return _p.singular_noun(lowered) or lowered
+
 
 def normalize_word(word: str) -> str:
     """
     Normalize a word to its lowercase singular form, preserving certain keywords.
+
+    Results are cached, so each distinct string is singularized once per
+    process; non-string input (e.g. NaN cells) is handled before the cache.
     """
     if not isinstance(word, str):
         return ""
-    lowered = word.lower().strip()
-    # Keywords to preserve as-is
-    keywords = {"class",
-                "process",
-                "progress",
-                "academic progress",
-                "address",
-                "delivery address",
-                "deliveryaddresnormalize_word",
-                "status",
-                "order status",
-                "business",
-                "scheduling process",
-                "payment process",
-                "hiring process"}
-    if lowered in keywords:
-        return lowered
-    # Attempt singularization; fallback to original lowercase
-    return _p.singular_noun(lowered) or lowered
+    return _normalize_str(word)
 
 
 def expand_synonym_mapping(compact_dict: dict) -> dict:
     """
     Expand a compact synonym dictionary into a flat mapping of synonym->standard term.
     """
-    flat = {}
-    for standard, synonyms in compact_dict.items():
-        norm_standard = normalize_word(standard)
-        for syn in synonyms:
-            norm_syn = normalize_word(syn)
-            flat[norm_syn] = norm_standard
-    return flat
+    # Each standard is normalized once, before its synonyms; a synonym listed
+    # under several standards keeps the last one, as before
+    return {
+        normalize_word(syn): norm_standard
+        for standard, synonyms in compact_dict.items()
+        for norm_standard in (normalize_word(standard),)
+        for syn in synonyms
+    }
 
 
-def generate_candidates(element: str, mapping: dict) -> set[str]:
+def _expand_candidates(element: str, mapping_items) -> frozenset[str]:
+    candidates = {element}
+    for key, val in mapping_items:
+        # Collect this key's replacements first and merge them afterwards, so
+        # they are only seen by later keys; no copy of the set per key
+        hits = [cand.replace(key, val).strip() for cand in candidates if key in cand]
+        if hits:
+            candidates.update(hits)
+    return frozenset(candidates)
+
+
+def generate_candidates(element: str, mapping: dict) -> frozenset[str]:
     """
     Generate a set of candidate strings by applying synonym replacements.
+    For repeated lookups against one mapping, use synonym_expander instead.
     """
     if not isinstance(element, str):
-        return set()
-    candidates = {element}
-    for key, val in mapping.items():
-        new_set = set(candidates)
-        for cand in candidates:
-            if key in cand:
-                replaced = cand.replace(key, val).strip()
-                new_set.add(replaced)
-        candidates = new_set
-    return candidates
+        return frozenset()
+    return _expand_candidates(element, mapping.items())
+
+
+def synonym_expander(mapping: dict) -> Callable[[str], frozenset[str]]:
+    """
+    Build generate_candidates for one synonym mapping, cached per element.
+
+    The same words recur across rounds, so build it once per mapping (e.g. per
+    dataset) and reuse it; the cache key is the element alone.
+    """
+    items = tuple(mapping.items())
+
+    @lru_cache(maxsize=None)
+    def expand(element: str) -> frozenset[str]:
+        if not isinstance(element, str):
+            return frozenset()
+        return _expand_candidates(element, items)
+
+    return expand
 
 
 def deduplicate_list(items: list[str]) -> list[str]:
     """
     Deduplicate a list of strings (case-insensitive), preserving order.
     """
-    seen = set()
-    result = []
+    first = {}  # lowercased item -> first item seen with it
+    keep_first = first.setdefault
     for item in items:
-        key = item.lower() if isinstance(item, str) else item
-        if key not in seen:
-            seen.add(key)
-            result.append(item)
-    return result
+        keep_first(item.lower() if isinstance(item, str) else item, item)
+    return list(first.values())
 
 
 def deduplicate_associations(associations: list[list[str]]) -> list[list[str]]:
     """
     Deduplicate (X,Y) pairs, ignoring an optional prefix on X, preserving the first occurrence.
     """
-    def _normalize(assoc: list[str]) -> tuple:
-        left, right = assoc
-        # remove '(opt)' or '(optional)' prefix (case-insensitive)
-        left_norm = re.sub(r"^\(opt(?:ional)?\)\s*", "", left, flags=re.IGNORECASE).strip().lower()
-        return (left_norm, right.lower().strip())
-
-    seen = set()
-    result = []
+    first = {}  # normalized (X, Y) -> first pair seen with it
+    keep_first = first.setdefault
     for assoc in associations:
-        norm = _normalize(assoc)
-        if norm not in seen:
-            seen.add(norm)
-            result.append(assoc)
-    return result
+        left, right = assoc
+        keep_first((OPT_PREFIX_RE.sub("", left).strip().lower(), right.lower().strip()), assoc)
+    return list(first.values())
@@ -1,18 +1,81 @@
 import os
-import pandas as pd
-from typing import List, Dict
-from pathlib import Path
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, List, Dict
 
+# pandas is imported inside the Excel helpers, so the extraction workers that
+# only need read_utf8 do not pay for it
+if TYPE_CHECKING:
+    import pandas as pd
 
-def load_excel_sheets(input_excel_path: str) -> Dict[str, pd.DataFrame]:
+
+@lru_cache(maxsize=None)
+def has_calamine() -> bool:
+    """
+    Whether the optional python-calamine package (pandas' Rust-based
+    "calamine" Excel reader, pandas >= 2.2) is installed.
+    """
+    return find_spec("python_calamine") is not None
+
+
+def excel_read_engine() -> str | None:
+    """
+    Engine for pd.read_excel: "calamine" when python-calamine is installed,
+    otherwise None (pandas' default, openpyxl for .xlsx).
+    """
+    return "calamine" if has_calamine() else None
+
+
+def load_excel_sheets(input_excel_path: str) -> Dict[str, "pd.DataFrame"]:
     """
-    Load all sheets from an Excel file.
+    Load all sheets from an Excel file in one pd.read_excel(sheet_name=None)
+    call, through the calamine engine when python-calamine is installed.
 
     :param input_excel_path: Path to the Excel file.
     :return: Dictionary mapping sheet names to their corresponding DataFrames.
     """
-    xls = pd.ExcelFile(input_excel_path)
-    return {sheet: pd.read_excel(xls, sheet_name=sheet) for sheet in xls.sheet_names}
+    import pandas as pd
+
+    return pd.read_excel(input_excel_path, sheet_name=None, engine=excel_read_engine())
+
+
+def read_utf8(path: str) -> str:
+    """
+    Read a whole UTF-8 text file in one unbuffered binary read and decode it
+    once, skipping the BufferedReader/TextIOWrapper layers of a text-mode open.
+
+    :param path: File to read.
+    :return: Decoded file content.
+    :raises FileNotFoundError: If the file does not exist.
+    """
+    with open(path, "rb", buffering=0) as f:
+        return f.read().decode("utf-8")
+
+
+def list_dataset_dirs(base_dir: str) -> List[str]:
+    """
+    List the dataset folders directly under base_dir, skipping hidden entries
+    (e.g. .DS_Store). Uses os.scandir so no extra stat call is made per entry.
+
+    :param base_dir: Model output folder containing one folder per dataset.
+    :return: Folder names in directory order.
+    """
+    with os.scandir(base_dir) as it:
+        return [e.name for e in it if e.is_dir() and not e.name.startswith(".")]
+
+
+def count_files(dir_path: str, suffix: str = ".txt") -> int:
+    """
+    Count the regular files in dir_path whose name ends with suffix.
+    Entries are counted straight off os.scandir, so no Path object or list is
+    built just to take its length.
+
+    :param dir_path: Folder to scan (not recursive).
+    :param suffix: File name ending to match.
+    :return: Number of matching files.
+    """
+    with os.scandir(dir_path) as it:
+        return sum(1 for e in it if e.name.endswith(suffix) and e.is_file())
 
 
 def write_experiment_log(output_dir: str, log_text: str) -> None:
@@ -44,19 +107,51 @@ def write_results_to_excel(
     :param mand_results: List of dictionaries for mandatory metrics.
     :param all_results: List of dictionaries including optional metrics.
     """
+    import pandas as pd
+
     os.makedirs(output_dir, exist_ok=True)
     out_path = os.path.join(output_dir, "evaluation_results.xlsx")
     print(f"Experiment results are saved in {out_path}")
-    with pd.ExcelWriter(out_path) as writer:
+    # Not constant_memory: to_excel writes column by column, and xlsxwriter
+    # silently drops writes to rows it has already flushed in that mode
+    with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
         pd.DataFrame(mand_results).to_excel(writer, sheet_name="mandatory", index=False)
         pd.DataFrame(all_results).to_excel(writer, sheet_name="including optional", index=False)
 
 
-def get_next_round_number(output_dir, pattern="*.txt"):
-    output_path = Path(output_dir)
-    if not output_path.exists():
-        return 1  # First round if the folder doesn't exist yet
+def write_counts_to_excel(out_path: str, key_col: str, counts) -> None:
+    """
+    Write (key, count) pairs, e.g. Counter.most_common(), as a single-sheet
+    workbook with a "<key_col> | count" header. Rows are streamed straight
+    into xlsxwriter in constant-memory mode, without building a DataFrame;
+    non-string keys (association tuples) are written as their str().
+
+    :param out_path: Path of the .xlsx file to create.
+    :param key_col: Header of the first column (e.g. "class").
+    :param counts: Iterable of (key, count) pairs, written in order.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(out_path, {"constant_memory": True, "strings_to_urls": False})
+    header_fmt = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+    ws = workbook.add_worksheet("Sheet1")
+    ws.write_row(0, 0, [key_col, "count"], header_fmt)
+    for i, (key, n) in enumerate(counts, start=1):
+        ws.write_string(i, 0, key if isinstance(key, str) else str(key))
+        ws.write_number(i, 1, n)
+    workbook.close()
 
-    # Count matching files (e.g., output text files)
-    existing_files = list(output_path.glob(pattern))
-    return len(existing_files) + 1
\ No newline at end of file
+
+def get_next_round_number(output_dir, suffix=".txt"):
+    """
+    Next round number for a generation output folder: one past the number
+    of existing round files (e.g. R1.txt, R2.txt) counted with count_files.
+
+    :param output_dir: Folder holding the round outputs.
+    :param suffix: File name ending of a round output.
+    :return: 1 if the folder does not exist yet, else the file count + 1.
+    """
+    try:
+        return count_files(output_dir, suffix) + 1
+    except FileNotFoundError:
+        return 1  # First round if the folder doesn't exist yet
\ No newline at end of file
@@ -1,14 +1,27 @@
-from pathlib import Path
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-# Determine the next available round number by counting existing output files
-def get_next_round_number(output_dir, pattern="*.txt"):
-    output_path = Path(output_dir)
-    if not output_path.exists():
-        return 1  # First round if the folder doesn't exist yet
+# Run the rounds of one generation experiment, optionally overlapping them
+def run_rounds(run_round, rounds, concurrency=1, delay=0.0):
+    """
+    Call run_round(r) for r in range(rounds).
 
-    # Count matching files (e.g., output text files)
-    existing_files = list(output_path.glob(pattern))
-    return len(existing_files) + 1
+    With concurrency 1 the rounds run one after another, pausing delay
+    seconds after each to avoid flooding the API. Otherwise up to concurrency
+    rounds are in flight at once in worker threads: each round is a chain of
+    blocking API calls, so threads overlap the waiting. run_round must only
+    touch its own round's output.
+    """
+    if concurrency <= 1:
+        for r in range(rounds):
+            run_round(r)
+            if delay:
+                time.sleep(delay)
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        # list() waits for every round and re-raises the first error
+        list(ex.map(run_round, range(rounds)))
 
 # Execute a multi-step prompt process with a given model client
 def process_steps(instructions, user_text, client, model, max_tokens, task, identified_classes=None, dataset_name=None):
@@ -1,6 +1,30 @@
-from typing import List, Tuple, Set, Dict
-import copy
-from .data_utils import normalize_word
+import re
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AbstractSet, Callable, Iterable, List, Mapping, Tuple, Set, Dict
+
+from .data_utils import normalize_word, synonym_expander
+
+# "(opt)" / "(sil)" markers on matched and unmatched items, stripped in one pass
+_MARKER_RE = re.compile(r"\((?:opt|sil)\)")
+
+
+@lru_cache(maxsize=None)
+def _prep_children(children_items: tuple) -> Mapping[str, tuple]:
+    """
+    Normalized non-punishment table for one dataset, inverted so each
+    normalized child maps to the parents listing it, in mapping order, as
+    (parent, normalized parent, frozenset of normalized siblings) triples.
+    The raw (parent, children) pairs are passed as a tuple so the result is
+    cached; it is returned read-only because every round shares it.
+    """
+    child_to_parents = {}
+    for parent, children in children_items:
+        entry = (parent, normalize_word(parent), frozenset(normalize_word(child) for child in children))
+        for norm_child in entry[2]:
+            child_to_parents.setdefault(norm_child, []).append(entry)
+    return MappingProxyType({child: tuple(parents) for child, parents in child_to_parents.items()})
 
 
 def remove_non_punished_from_unmatched(
@@ -27,25 +51,24 @@ def remove_non_punished_from_unmatched(
     children_map = non_punishment_mapping.get(dataset, {})
     if not children_map:
         return unmatched, log
+    # Normalized child -> parents index, built once per dataset and reused
+    child_to_parents = _prep_children(tuple((parent, tuple(children)) for parent, children in children_map.items()))
     # Normalize matched items for membership checks
-    normalized_matched = {normalize_word(item.replace("(opt)", "").replace("(sil)", "").strip()) for item in matched}
+    normalized_matched = {normalize_word(_MARKER_RE.sub("", item).strip()) for item in matched}
 
     pruned_unmatched = []
     for item in unmatched:
         # Clean markers and normalize
-        clean_item = normalize_word(item.replace("(opt)", "").replace("(sil)", "").strip())
+        clean_item = normalize_word(_MARKER_RE.sub("", item).strip())
 
-        # Determine if this item is in any matched parent's child list
+        # Determine if this item is in any matched parent's child list: only
+        # the parents that list it are checked
         skip = False
-        for parent, children in children_map.items():
-            norm_parent = normalize_word(parent)
-            if norm_parent in normalized_matched or any(normalize_word(child) in normalized_matched for child in children):
-                # Normalize all children for comparison
-                child_norms = {normalize_word(child) for child in children}
-                if clean_item in child_norms:
-                    log += f"Non-punish: '{item}' removed because its parent '{parent}' was matched.\n"
-                    skip = True
-                    break
+        for parent, norm_parent, child_norms in child_to_parents.get(clean_item, ()):
+            if norm_parent in normalized_matched or not normalized_matched.isdisjoint(child_norms):
+                log += f"Non-punish: '{item}' removed because its parent '{parent}' was matched.\n"
+                skip = True
+                break
         if not skip:
             pruned_unmatched.append(item)
 
@@ -86,36 +109,49 @@ def compute_precision_recall_fbeta(tp: int, fp: int, fn: int, beta: float = 1.0)
     }
 
 
-def generate_candidates(element: str, mapping: dict) -> set[str]:
+def _take(pool: Counter, key) -> None:
+    """
+    Remove one occurrence of key from a multiset pool, dropping the key at
+    zero so `in` and truthiness keep meaning "still available".
+    """
+    if pool[key] == 1:
+        del pool[key]
+    else:
+        pool[key] -= 1
+
+
+def _pool(standard: Iterable[str] | Mapping[str, int]) -> Counter:
     """
-    Generate a set of candidate strings by applying synonym replacements.
+    Fresh multiset pool for a standard: any iterable (list, set, frozenset)
+    is counted per occurrence, and a Counter/mapping of counts is copied
+    keeping only positive counts, so `in` means "still available".
     """
-    if not isinstance(element, str):
-        return set()
-    candidates = {element}
-    for key, val in mapping.items():
-        new_set = set(candidates)
-        for cand in candidates:
-            if key in cand:
-                replaced = cand.replace(key, val).strip()
-                new_set.add(replaced)
-        candidates = new_set
-    return candidates
+    if isinstance(standard, Mapping):
+        return Counter({k: n for k, n in standard.items() if n > 0})
+    return Counter(standard)
+
 
 def perform_matching(words, is_optional, gold_standard, silver_standard, synonym_map):
     """
     Two-phase matching:
       1) exact against gold, then silver  
       2) synonym-based against gold, then silver  
+    gold_standard / silver_standard may be any iterable of normalized names
+    or a Counter of them; they are coerced once on entry and never mutated.
+    synonym_map is a synonym dict or a synonym_expander built from one.
     Returns (mandatory_matched, optional_matched, mandatory_unmatched, optional_unmatched, log)
     """
-    remaining_gold_all = copy.copy(gold_standard)
-    remaining_gold_man = copy.copy(gold_standard)
-    remaining_silv = copy.copy(silver_standard)
+    # Remaining standards are multiset pools: O(1) lookup and removal, and a
+    # standard listing an entry twice can be matched twice
+    remaining_gold_all = _pool(gold_standard)
+    remaining_gold_man = remaining_gold_all.copy()
+    remaining_silv = _pool(silver_standard)
 
     mand_matched, opt_matched = [], []
     mand_un,   opt_un      = [], []
     log_lines = []
+    # An expander built once per dataset keeps its cache across calls
+    expand = synonym_map if callable(synonym_map) else synonym_expander(synonym_map)
 
     # 1) Exact-match pass
     unmatched_indices = []
@@ -126,16 +162,16 @@ def perform_matching(words, is_optional, gold_standard, silver_standard, synonym
         # Try exact against gold and silver
         for var in variants:
             if var in remaining_gold_all:
-                remaining_gold_all.remove(var)
+                _take(remaining_gold_all, var)
                 if not opt:
-                    remaining_gold_man.remove(var)
+                    _take(remaining_gold_man, var)
                     mand_matched.append(w)
                 else:
                     opt_matched.append(w)
                 matched = True
                 break
             if var in remaining_silv:
-                remaining_silv.remove(var)
+                _take(remaining_silv, var)
                 target = opt_matched if opt else mand_matched
                 target.append(f"(sil){w}")
                 log_lines.append(f"[Silver exact matched] {'(Opt) ' if opt else ''}{w}\n")
@@ -148,16 +184,21 @@ def perform_matching(words, is_optional, gold_standard, silver_standard, synonym
     # 2) Synonym-match pass (only for those still unmatched)
     for i in unmatched_indices:
         w, opt = words[i], is_optional[i]
+        if not remaining_gold_all and not remaining_silv:
+            # Every gold/silver entry is taken, so no candidate can match;
+            # skip the synonym expansion
+            (opt_un if opt else mand_un).append(w)
+            continue
         variants = w.split("/") if "/" in w else [w]
         matched = False
 
         for var in variants:
-            cands = generate_candidates(var, synonym_map)
+            cands = expand(var)
             for c in cands:
                 if c in remaining_gold_all:
-                    remaining_gold_all.remove(c)
+                    _take(remaining_gold_all, c)
                     if not opt:
-                        remaining_gold_man.remove(c)
+                        _take(remaining_gold_man, c)
                         mand_matched.append(w)
                     else:
                         opt_matched.append(w)
@@ -166,7 +207,7 @@ def perform_matching(words, is_optional, gold_standard, silver_standard, synonym
                     break
 
                 if c in remaining_silv:
-                    remaining_silv.remove(c)
+                    _take(remaining_silv, c)
                     target = opt_matched if opt else mand_matched
                     target.append(w)
                     log_lines.append(f"[Silv syn]    {'(Opt) ' if opt else ''}{w} → {c}\n")
@@ -192,50 +233,57 @@ def perform_matching(words, is_optional, gold_standard, silver_standard, synonym
     for u in opt_un:
         log_lines.append(f"[Unmatched]  (Opt) {u}")
     log_lines.append("===========")
-    for m in remaining_gold_all:
+    for m in remaining_gold_all.elements():
         log_lines.append(f"[Missing]  {m}")
     log_lines.append("===========")
 
     log = "\n".join(log_lines)
 
-    return mand_matched, opt_matched, mand_un, opt_un, log, remaining_gold_man, remaining_gold_all
+    # Leftover gold is handed back as plain lists, one item per occurrence
+    return (mand_matched, opt_matched, mand_un, opt_un, log,
+            list(remaining_gold_man.elements()), list(remaining_gold_all.elements()))
 
 def perform_matching_associations(
     assoc_lines: List[str],
     is_opt:      List[bool],
-    gold_std:    Set[frozenset],
-    silver_std:  Set[frozenset],
-    synonym_map: Dict[str,str]
+    gold_std:    AbstractSet[Tuple[str, str]],
+    silver_std:  AbstractSet[Tuple[str, str]],
+    synonym_map: Mapping[str,str] | Callable[[str], frozenset[str]]
 ) -> Tuple[
     List[str],  # mand_matched
     List[str],  # opt_matched
     List[str],  # mand_unmatched
     List[str],  # opt_unmatched
     str,        # log
-    Set[frozenset],  # remaining_gold_man
-    Set[frozenset]   # remaining_gold_all
+    Set[Tuple[str, str]],  # remaining_gold_man
+    Set[Tuple[str, str]]   # remaining_gold_all
 ]:
     """
     Two-phase matching over associations (X-Y strings):
       1) exact vs gold → silver
       2) synonyms vs gold → silver
 
+    Standards hold each pair as an alphabetically sorted (X, Y) tuple, so
+    lookups are order-insensitive without building a frozenset per probe.
+
     Returns the same tuple shape as your perform_matching for classes.
     """
-    # copies of the standards
-    remaining_gold_all = copy.copy(gold_std)
-    remaining_gold_man = copy.copy(gold_std)
-    remaining_silv     = copy.copy(silver_std)
+    # mutable copies of the standards (callers may pass frozensets)
+    remaining_gold_all = set(gold_std)
+    remaining_gold_man = set(gold_std)
+    remaining_silv     = set(silver_std)
 
     mand_matched, opt_matched = [], []
     mand_un,      opt_un      = [], []
     log_lines = []
+    # An expander built once per dataset keeps its cache across calls
+    expand = synonym_map if callable(synonym_map) else synonym_expander(synonym_map)
 
     # Eexact-match pass
     unmatched_indices = []
     for i, (w, opt) in enumerate(zip(assoc_lines, is_opt)):
         X, Y = w[0], w[1]
-        original = frozenset({X, Y})
+        original = (X, Y) if X <= Y else (Y, X)
 
         # Exact gold
         if original in remaining_gold_all:
@@ -262,18 +310,23 @@ def perform_matching_associations(
     for i in unmatched_indices:
         w = assoc_lines[i]
         opt = is_opt[i]
+        if not remaining_gold_all and not remaining_silv:
+            # Every gold/silver pair is taken, so no candidate can match;
+            # skip the synonym expansion
+            (opt_un if opt else mand_un).append(w)
+            continue
         X, Y = w[0], w[1]
         found = False
 
         # generate all candidate pairings via synonyms
-        cands_x = generate_candidates(X, synonym_map)
-        cands_y = generate_candidates(Y, synonym_map)
+        cands_x = expand(X)
+        cands_y = expand(Y)
         # Synonyms → gold
         for cx in cands_x:
             if found:
                 break
             for cy in cands_y:
-                cand_pair = frozenset({cx, cy})
+                cand_pair = (cx, cy) if cx <= cy else (cy, cx)
                 if cand_pair in remaining_gold_all:
                     remaining_gold_all.remove(cand_pair)
                     if not opt:
@@ -292,7 +345,7 @@ def perform_matching_associations(
             if found:
                 break
             for cy in cands_y:
-                cand_pair = frozenset({cx, cy})
+                cand_pair = (cx, cy) if cx <= cy else (cy, cx)
                 if cand_pair in remaining_silv:
                     remaining_silv.remove(cand_pair)
                     target = opt_matched if opt else mand_matched
@@ -0,0 +1,23 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_parallel(fn, items, workers=None) -> list:
+    """
+    Call fn(*args) for every args tuple in items and return the results in
+    order, spread over worker processes. fn and its arguments must be
+    picklable (module-level functions, plain data).
+
+    :param fn: Function to call.
+    :param items: Iterable of argument tuples, one per call.
+    :param workers: Max number of processes (default: one per CPU); 1 or less
+        runs every call serially in this process.
+    :return: List of fn's return values, in the order of items.
+    """
+    items = list(items)
+    # Workers beyond the number of calls would only add process start-up cost
+    n_workers = min((os.cpu_count() or 1) if workers is None else workers, len(items))
+    if n_workers <= 1:
+        return [fn(*args) for args in items]
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        return list(ex.map(fn, *zip(*items)))
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import os
 from pathlib import Path
 from class_assoc_pipeline.config import (
     EXPERIMENT_OUTPUT_DIR,
@@ -9,6 +8,79 @@ from class_assoc_pipeline.config import (
     MODELS
 )
 from class_assoc_pipeline.utils.aggregation_utils import aggregate_unmatched_results
+from class_assoc_pipeline.utils.file_io import list_dataset_dirs, excel_read_engine
+from class_assoc_pipeline.utils.parallel_utils import run_parallel
+
+def _summarize_dataset(experiment_type: str, model: str, dataset: str):
+    """
+    Aggregate one model/dataset's experiment_results.xlsx: append AVG and
+    STD-DEV rows to each sheet, write them to
+    experiment_results_with_aggregation.xlsx next to it, and return
+    (dataset_lower, [(col_label, avg_dict, var_dict), ...]) for the
+    comparison table. Each call only touches its own dataset folder, so
+    calls can run in separate processes.
+    """
+    dataset_lower = dataset.lower()
+    input_file = f"output/{experiment_type}/{model}/{dataset}/experiment_results.xlsx"
+    summaries = []
+    combined_by_sheet = {}
+
+    # Process both sheets: mandatory and including optional, parsed in one
+    # read of the workbook (the dict keeps this sheet order)
+    sheets = pd.read_excel(input_file, sheet_name=["mandatory", "including optional"],
+                           engine=excel_read_engine())
+    for sheet, df in sheets.items():
+        # Drop the "Round" column
+        metrics = df.drop(columns=["Round"])
+
+        # Compute row‐wise average and standard deviation
+        avg_vals = metrics.mean().round(3)
+        std_vals = metrics.std().round(3)
+
+        # Append AVG and STD-DEV rows to a combined DataFrame
+        avg_row = pd.DataFrame([["AVG"] + avg_vals.tolist()], columns=df.columns)
+        std_row = pd.DataFrame([["STD-DEV"] + std_vals.tolist()], columns=df.columns)
+        combined_by_sheet[sheet] = pd.concat([df, avg_row, std_row], ignore_index=True)
+
+        # Averages and variations for the final comparison table
+        col_label = model if sheet == "mandatory" else f"{model}(Opt)"
+        summaries.append((col_label, avg_vals.to_dict(), std_vals.to_dict()))
+
+    # Write both aggregated sheets back to the dataset folder in one fresh
+    # workbook, rather than reopening it through openpyxl per sheet
+    out_path = f"output/{experiment_type}/{model}/{dataset}/experiment_results_with_aggregation.xlsx"
+    with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
+        for sheet, combined in combined_by_sheet.items():
+            combined.to_excel(writer, sheet_name=sheet, index=False)
+
+    return dataset_lower, summaries
+
+
+def _pivot_records(records, index, columns) -> pd.DataFrame:
+    """
+    Lay (dataset, model column, metric, value) records out as a table over
+    the given index and MultiIndex columns (empty cells are NaN). As with
+    per-cell assignment, datasets or (model column, metric) pairs that are
+    not in the layout are appended in first-seen order, and a repeated cell
+    keeps its last value.
+    """
+    if not records:
+        return pd.DataFrame(np.nan, index=index, columns=columns)
+
+    df = pd.DataFrame.from_records(records, columns=["dataset", "model_col", "metric", "value"])
+    table = (
+        df.drop_duplicates(["dataset", "model_col", "metric"], keep="last")
+          .pivot(index="dataset", columns=["model_col", "metric"], values="value")
+    )
+    table.index.name = None
+    table.columns.names = [None, None]
+
+    rows = pd.Index(list(dict.fromkeys([*index, *df["dataset"]])))
+    cols = pd.MultiIndex.from_tuples(
+        list(dict.fromkeys([*columns, *zip(df["model_col"], df["metric"])]))
+    )
+    return table.reindex(index=rows, columns=cols).astype(float)
+
 
 def run_experiment_comparison(
     experiment_type="Class",
@@ -16,7 +88,8 @@ def run_experiment_comparison(
     avg_sub_cols=None,
     variation_sub_cols=None,
     models=None,
-    output_file=None
+    output_file=None,
+    workers=None
 ):
     """
     Aggregate and compare experiment results across datasets and models.
@@ -27,6 +100,9 @@ def run_experiment_comparison(
     :param variation_sub_cols: Sub-columns to calculate variation (defaults to ["Precision", "Recall"]).
     :param models: List of model names to include (defaults to ["GPT-o1", "Llama 3 8B", "Qwen14B"]).
     :param output_file: Path to the final comparison Excel file.
+    :param workers: Max processes summarizing model/dataset folders in parallel
+        (defaults to one per CPU, never more than the folders; 1 or less
+        runs them serially).
     """
     # Set default main columns if not provided
     if main_cols is None:
@@ -59,76 +135,32 @@ def run_experiment_comparison(
     base_path = "output/class/GPT-o1"
 
     # Discover all dataset folders
-    datasets = [
-        folder.lower()
-        for folder in os.listdir(base_path)
-        if folder != ".DS_Store"
-    ]
+    datasets = [folder.lower() for folder in list_dataset_dirs(base_path)]
 
-    # Prepare multi‐indexed DataFrames for average and variation
+    # Multi‐indexed layouts for the average and variation tables
     avg_columns = pd.MultiIndex.from_product([main_cols, avg_sub_cols])
-    final_df_average = pd.DataFrame(np.nan, index=datasets, columns=avg_columns)
-
     var_columns = pd.MultiIndex.from_product([main_cols, variation_sub_cols])
-    final_df_variation = pd.DataFrame(np.nan, index=datasets, columns=var_columns)
-
-    # Process each model and dataset
-    for model in models:
-        experiment_type = experiment_type.lower()
-        for dataset in os.listdir(f"output/{experiment_type}/{model}"):
-            if dataset == ".DS_Store":
-                continue
-
-            dataset_lower = dataset.lower()
-            input_file = f"output/{experiment_type}/{model}/{dataset}/experiment_results.xlsx"
-
-            # Process both sheets: mandatory and including optional
-            for sheet in ["mandatory", "including optional"]:
-                df = pd.read_excel(input_file, sheet_name=sheet)
-                # Drop the "Round" column
-                metrics = df.drop(columns=["Round"])
-
-                # Compute row‐wise average and standard deviation
-                avg_vals = metrics.mean().round(3)
-                std_vals = metrics.std().round(3)
-
-                # Append AVG and STD-DEV rows to a combined DataFrame
-                avg_row = pd.DataFrame([["AVG"] + avg_vals.tolist()], columns=df.columns)
-                std_row = pd.DataFrame([["STD-DEV"] + std_vals.tolist()], columns=df.columns)
-                combined = pd.concat([df, avg_row, std_row], ignore_index=True)
-
-                # Write the aggregated sheet back to the dataset folder
-                
-                out_path = f"output/{experiment_type}/{model}/{dataset}/experiment_results_with_aggregation.xlsx"
-                mode   = "a" if os.path.exists(out_path) else "w"
-
-                if mode == "a":
-                    # append to an existing file, replacing the sheet if it exists
-                    with pd.ExcelWriter(
-                        out_path,
-                        engine="openpyxl",
-                        mode="a",
-                        if_sheet_exists="replace"
-                    ) as writer:
-                        combined.to_excel(writer, sheet_name=sheet, index=False)
-                else:
-                    # write a brand new file (no if_sheet_exists allowed)
-                    with pd.ExcelWriter(
-                        out_path,
-                        engine="xlsxwriter",
-                        mode="w"
-                    ) as writer:
-                        combined.to_excel(writer, sheet_name=sheet, index=False)
-
-                # Extract averages and variations for the final comparison table
-                avg_dict = avg_vals.to_dict()
-                var_dict = std_vals.to_dict()
-                for metric, value in avg_dict.items():
-                    col_label = model if sheet == "mandatory" else f"{model}(Opt)"
-                    final_df_average.at[dataset_lower, (col_label, metric)] = value
-                for metric, value in var_dict.items():
-                    col_label = model if sheet == "mandatory" else f"{model}(Opt)"
-                    final_df_variation.at[dataset_lower, (col_label, metric)] = value
+
+    # Every model/dataset pair is summarized independently (own input and
+    # output workbook), so they run in worker processes; the parent only
+    # fills the comparison table from the returned values.
+    experiment_type = experiment_type.lower()
+    tasks = [
+        (experiment_type, model, dataset)
+        for model in models
+        for dataset in list_dataset_dirs(f"output/{experiment_type}/{model}")
+    ]
+    results = run_parallel(_summarize_dataset, tasks, workers)
+
+    # Collect (dataset, model column, metric, value) records and lay each
+    # table out in one pivot instead of one .at assignment per cell
+    avg_records, var_records = [], []
+    for dataset_lower, summaries in results:
+        for col_label, avg_dict, var_dict in summaries:
+            avg_records.extend((dataset_lower, col_label, metric, value) for metric, value in avg_dict.items())
+            var_records.extend((dataset_lower, col_label, metric, value) for metric, value in var_dict.items())
+    final_df_average = _pivot_records(avg_records, datasets, avg_columns)
+    final_df_variation = _pivot_records(var_records, datasets, var_columns)
 
     # Compute between‐dataset average and variation
     between_avg = final_df_average.mean().to_frame().T.round(3)
@@ -144,27 +176,11 @@ def run_experiment_comparison(
     # Write the final comparison workbook
     output_path = Path(f"output/experiment/{experiment_type}_experiment_comparison_result.xlsx")
 
-    # If the file already exists on disk → append and replace sheets:
-    if output_path.exists():
-        with pd.ExcelWriter(
-            output_path,
-            engine="openpyxl",
-            mode="a",
-            if_sheet_exists="replace"
-        ) as writer:
-            final_df_average.to_excel(writer, sheet_name=f"{experiment_type}-Performance")
-            final_df_variation.to_excel(writer, sheet_name=f"{experiment_type}-Variation")
-
-    # Otherwise → write a new file (no if_sheet_exists allowed here)
-    else:
-        with pd.ExcelWriter(
-            output_path,
-            engine="xlsxwriter",
-            mode="w"
-        ) as writer:
-            final_df_average.to_excel(writer, sheet_name=f"{experiment_type}-Performance")
-            final_df_variation.to_excel(writer, sheet_name=f"{experiment_type}-Variation")
-
+    # Both sheets are rebuilt on every run, so the workbook is rewritten
+    # with xlsxwriter instead of opened and appended to through openpyxl
+    with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+        final_df_average.to_excel(writer, sheet_name=f"{experiment_type}-Performance")
+        final_df_variation.to_excel(writer, sheet_name=f"{experiment_type}-Variation")
 
 if __name__ == "__main__":
     # Run comparison for class experiments
@@ -1,18 +1,45 @@
 import re
+from functools import lru_cache
+from itertools import chain
 from typing import List, Tuple
 import inflect
 
 _p = inflect.engine()
 
+# Pre-compiled patterns shared by the cleaning helpers below
+_BOLD_RE = re.compile(r"\*{1,2}(.*?)\*{1,2}")
+_LEADING_STAR_RE = re.compile(r"^\*+\s*")
+_OPTIONAL_RE = re.compile(r"\(optional\)", re.IGNORECASE)
+_OPT_TAG_RE = re.compile(r"\(opt(?:ional)?\)", re.IGNORECASE)
+_OPT_TAG_GROUP_RE = re.compile(r"\((optional|opt)\)", re.IGNORECASE)
+_OPT_PREFIX_RE = re.compile(r"^\(Opt(?:ional)?\)\s*", re.IGNORECASE)
+_OPTIONAL_PREFIX_RE = re.compile(r"^\(\s*optional\)\s*", re.IGNORECASE)
+_OPT_OR_OPTIONAL_PREFIX_RE = re.compile(r"^\((?:optional|opt)\)", re.IGNORECASE)
+_OPT_OR_OPTIONAL_PREFIX_WS_RE = re.compile(r"^\((?:optional|opt)\)\s*", re.IGNORECASE)
+_OPTIONAL_LEADING_RE = re.compile(r"^\(optional\)\s*", re.IGNORECASE)
+_ANY_PREFIX_RE = re.compile(r"^\(\s*[^)]+\)\s*")
+_QUOTES_RE = re.compile(r"[`“”‘’]")
+_AND_SPLIT_RE = re.compile(r"\s+and\s+")
+_OPEN_PAREN_RE = re.compile(r"\(")
+_BULLET_RE = re.compile(r"^(?:\d+\.\s*|\*\s*|\-\s*)")
+_OR_PREFIX_RE = re.compile(r"^(?:or|or simply)\s*", re.IGNORECASE)
+_OR_OFTEN_PREFIX_RE = re.compile(r"^(?:or\s*simply|or|often)\s*", re.IGNORECASE)
+_SLASH_OR_SPLIT_RE = re.compile(r"\s*/\s*|\s+or\s+", re.IGNORECASE)
+_OR_AND_SPLIT_RE = re.compile(r"\s+or\s+|\s+and\s+", re.IGNORECASE)
+_PAREN_AND_RE = re.compile(r"^(.*?)\s*\(\s*and\s*(.*?)\s*\)\s*$", re.IGNORECASE)
+_PLAIN_AND_RE = re.compile(r"^(.*?)\s+and\s+(.*?)$", re.IGNORECASE)
+_PAREN_GROUP_RE = re.compile(r"\s*\([^)]*\)")
+_OPTIONAL_STAR_RE = re.compile(r"\(Optional\)\s*\*\s*")
+
 def clean_class_name(content: str) -> str:
     """
     Removes Markdown-style bold symbols (e.g., **Class**) and leading asterisks,
     then trims any extra surrounding whitespace.
     """
     # Remove Markdown bold markers (**...**) and any single '*' around text
-    content = re.sub(r"\*{1,2}(.*?)\*{1,2}", r"\1", content)
+    content = _BOLD_RE.sub(r"\1", content)
     # Remove leading '*' characters
-    content = re.sub(r"^\*+\s*", "", content)
+    content = _LEADING_STAR_RE.sub("", content)
     content = normalize_word(content)
     return content.strip()
 
@@ -22,9 +49,9 @@ def format_optional_line(content: str) -> str:
     appears at the start. It retains any trailing notes after a dash.
     """
     # Detect '(optional)' tag
-    if re.search(r"\(optional\)", content, re.IGNORECASE):
+    if _OPTIONAL_RE.search(content):
         # Remove all '(optional)' instances, then strip extra whitespace
-        base = re.sub(r"\(optional\)", "", content, flags=re.IGNORECASE).strip()
+        base = _OPTIONAL_RE.sub("", content).strip()
         return f"(optional) {base}"
     return remove_trailing_notes(content.strip())
 
@@ -34,12 +61,11 @@ def remove_trailing_notes(line: str) -> str:
     Strips trailing notes or formatting characters such as ':', '-', and '`' from a line.
     """
     # Split and keep only the part before ':', '-', '–' (- and – are different), and '`'
-    for sep in [":", "-", "–"]:
-        if sep in line:
-            line = line.split(sep, 1)[0]
+    for sep in (":", "-", "–"):
+        line = line.partition(sep)[0]
 
     # ASCII and typographic quotes:
-    line = re.sub(r"[`“”‘’]", "", line)
+    line = _QUOTES_RE.sub("", line)
     return line.strip()
 
 def remove_trailing_notes_association(line: str) -> str:
@@ -56,24 +82,36 @@ def remove_trailing_notes_association(line: str) -> str:
     line = line.strip().replace("**", "").replace(" - ", "-")
 
     # 3) Drop any trailing notes after a colon
-    if ":" in line:
-        line = line.split(":", 1)[0]
+    line = line.partition(":")[0]
 
     # 4) Remove any backticks or typographic quotes
-    line = re.sub(r"[`“”‘’]", "", line)
+    line = _QUOTES_RE.sub("", line)
 
     return line.strip()
 
+def _split_head(s: str) -> str:
+    """
+    Return the part of s before the first '(' or '/' (all of s if neither occurs).
+    """
+    i = len(s)
+    j = s.find("(")
+    if j != -1:
+        i = j
+    k = s.find("/", 0, i)
+    if k != -1:
+        i = k
+    return s[:i]
+
 def split_mandatory_entities(text: str) -> list[str]:
     """
     Splits a combined class description into individual entities by 'and', commas, and
     strips off any parenthetical or slash segments.
     """
-    parts = re.split(r"\s+and\s+", text)
+    parts = _AND_SPLIT_RE.split(text)
     result = []
     for part in parts:
         # Remove anything after '(' or '/'
-        part = re.split(r"[\(/]", part)[0]
+        part = _split_head(part)
         # Split by commas and strip whitespace
         for item in part.split(','):
             item = item.strip()
@@ -90,9 +128,11 @@ def clean_association_line(line: str, force_optional: bool = False) -> str:
     - Drop any trailing notes after ' - '
     - Optionally prefix '(optional)'
     """
-    line = re.sub(r"^(?:\d+\.\s*|\*\s*|\-\s*)", "", line)
-    is_opt = force_optional or bool(re.search(r"\(opt(?:ional)?\)", line, re.IGNORECASE))
-    line = re.sub(r"\(opt(?:ional)?\)", "", line, flags=re.IGNORECASE).strip()
+    line = _BULLET_RE.sub("", line)
+    # One scan both removes the "(opt)"/"(optional)" tag and reports whether it was there
+    line, n_tags = _OPT_TAG_RE.subn("", line)
+    line = line.strip()
+    is_opt = force_optional or n_tags > 0
     # line = re.sub(r"\([^)]*?Explanation:[^)]*\)", "", line, flags=re.IGNORECASE)
     core = line.split(' - ', 1)[0]
     parts = [normalize_word(seg.strip()) for seg in core.split('-')]
@@ -119,16 +159,16 @@ def expand_or_variants(entity: str) -> list[str]:
     # 1) Remove outer quotes and normalize parentheses
     text = entity.strip()
     # capture the head before any '('
-    head, *rest = re.split(r'\(', text, 1)
+    head, *rest = _OPEN_PAREN_RE.split(text, 1)
     variants = [head.strip()]
     
     if rest:
         # take inside the first parentheses
         inside = rest[0].rstrip(')')
         # remove leading "or" or "or simply"
-        inside = re.sub(r'^(?:or|or simply)\s*', '', inside, flags=re.IGNORECASE)
+        inside = _OR_PREFIX_RE.sub('', inside)
         # split on slash or literal " / "
-        parts = re.split(r'\s*/\s*|\s+or\s+', inside, flags=re.IGNORECASE)
+        parts = _SLASH_OR_SPLIT_RE.split(inside)
         for p in parts:
             cleaned = p.strip().strip('“”"\'')
             if cleaned:
@@ -143,22 +183,22 @@ def flatten_or_variants(entity: str) -> str:
         "(Optional) Profile/Account"
     """
     # Detect and remove leading "(Optional)"
-    opt_match = re.match(r'^\(\s*optional\)\s*', entity, flags=re.IGNORECASE)
+    opt_match = _OPTIONAL_PREFIX_RE.match(entity)
     is_optional = bool(opt_match)
     if is_optional:
         # strip off the exact prefix we matched
         entity = entity[opt_match.end():]
 
     # Split off at the first "("
-    head, *rest = re.split(r'\(', entity, 1)
+    head, *rest = _OPEN_PAREN_RE.split(entity, 1)
     # Clean up any Markdown bold around the head
-    head = re.sub(r'\*{1,2}(.*?)\*{1,2}', r'\1', head).strip()
+    head = _BOLD_RE.sub(r'\1', head).strip()
     variants = [head]
 
     if rest:
         inside = rest[0].rstrip(')')
-        inside = re.sub(r'^(?:or\s*simply|or|often)\s*', '', inside, flags=re.IGNORECASE)
-        parts = re.split(r'\s*/\s*|\s+or\s+', inside, flags=re.IGNORECASE)
+        inside = _OR_OFTEN_PREFIX_RE.sub('', inside)
+        parts = _SLASH_OR_SPLIT_RE.split(inside)
 
         for p in parts:
             cleaned = p.strip().strip('“”"\' ')
@@ -169,6 +209,31 @@ def flatten_or_variants(entity: str) -> str:
     # 3) Re-add the "(Optional)" prefix if needed
     return f"(Optional) {joined}" if is_optional else joined
 
+# Keywords that normalize_word keeps as-is (built once, not on every call)
+_KEYWORDS = frozenset({
+    "class",
+    "process",
+    "progress",
+    "academic progress",
+    "address",
+    "delivery address",
+    "deliveryaddres",
+    "status",
+    "order status",
+    "business",
+})
+
+
+@lru_cache(maxsize=100_000)
+def _singular(lowered: str) -> str:
+    """
+    Singular form of an already lowercased, stripped word (itself if inflect
+    finds none). inflect's rule engine is the expensive part of
+    normalize_word, so each distinct word goes through it once per process.
+    """
+    return _p.singular_noun(lowered) or lowered
+
+
 def normalize_word(word: str) -> str:
     """
     Normalize a word to its lowercase singular form, preserving certain keywords.
@@ -178,21 +243,10 @@ def normalize_word(word: str) -> str:
     lowered = word.lower().strip()
     if not lowered:
         return ''
-    # Keywords to preserve as-is
-    keywords = {"class",
-                "process",
-                "progress",
-                "academic progress",
-                "address",
-                "delivery address",
-                "deliveryaddres",
-                "status",
-                "order status",
-                "business",}
-    if lowered in keywords:
+    if lowered in _KEYWORDS:
         return lowered
     # Attempt singularization; fallback to original lowercase
-    return _p.singular_noun(lowered) or lowered
+    return _singular(lowered)
 
 def normalize_assoc(assoc: list[str]) -> tuple[str,str]:
     """
@@ -205,7 +259,7 @@ def normalize_assoc(assoc: list[str]) -> tuple[str,str]:
     regardless of original order, case, or tag presence.
     """
     left, right = assoc
-    left = re.sub(r'^\(Opt(?:ional)?\)\s*', '', left, flags=re.IGNORECASE)
+    left = _OPT_PREFIX_RE.sub('', left)
     cleaned = [clean_class_name(left), clean_association_line(right)]
     return '-'.join(sorted(s.lower().strip() for s in cleaned))
 
@@ -217,14 +271,14 @@ def flatten_and_variants(entity: str) -> List[str]:
         ["(Optional) X", "(Optional) Y"]
     """
     # 1) pull off an "(optional)" prefix if it’s there
-    opt_match = re.match(r'^\(\s*optional\)\s*', entity, flags=re.IGNORECASE)
+    opt_match = _OPTIONAL_PREFIX_RE.match(entity)
     prefix = ""
     if opt_match:
         prefix = opt_match.group(0).strip() + " "
         entity = entity[opt_match.end():]
 
     # 2) first, the parenthesized-and rule: e.g. "X (and Y)"
-    m = re.match(r'^(.*?)\s*\(\s*and\s*(.*?)\s*\)\s*$', entity, re.IGNORECASE)
+    m = _PAREN_AND_RE.match(entity)
     if m:
         return [
             f"{prefix}{m.group(1).strip()}",
@@ -232,7 +286,7 @@ def flatten_and_variants(entity: str) -> List[str]:
         ]
 
     # 3) **new** plain-and rule: e.g. "A and B" (no parentheses)
-    m2 = re.match(r'^(.*?)\s+and\s+(.*?)$', entity, re.IGNORECASE)
+    m2 = _PLAIN_AND_RE.match(entity)
     if m2:
         return [
             f"{prefix}{m2.group(1).strip()}",
@@ -253,31 +307,23 @@ def deduplicate_associations(assocs: list[list[str]]) -> list[list[str]]:
     """
     seen = dict()  # key -> index of the preferred version
     out = []
-    mandatory = []
-    optional = []
+    out_is_optional = []  # parallel to `out`, avoids re-scanning kept pairs
 
     for a in assocs:
         key = normalize_assoc(a)
-        is_optional = any(re.search(r"\(opt(?:ional)?\)", s, flags=re.IGNORECASE) for s in a)
+        is_optional = any(_OPT_TAG_RE.search(s) for s in a)
 
         if key not in seen:
             seen[key] = len(out)
             out.append(a)
-            if is_optional:
-                optional.append(a)
-            else:
-                mandatory.append(a)
+            out_is_optional.append(is_optional)
         else:
             existing_index = seen[key]
-            existing = out[existing_index]
-            existing_is_optional = any(re.search(r"\(opt(?:ional)?\)", s, flags=re.IGNORECASE) for s in existing)
 
             # Prefer mandatory version if one exists
-            if existing_is_optional and not is_optional:
+            if out_is_optional[existing_index] and not is_optional:
                 out[existing_index] = a  # replace optional with mandatory
-                if existing in optional:
-                    optional.remove(existing)
-                mandatory.append(a)
+                out_is_optional[existing_index] = False
 
     return out
 
@@ -287,15 +333,15 @@ def dedupe_preserve_optional_first(mandatory: list[str], optional: list[str]) ->
     Merge mandatory + optional lists, but if an item appears in both (ignoring "(optional) "),
     only keep whichever came first in the combined sequence.
     """
-    seen = set()
-    combined = []
-    for item in (mandatory + optional):
+    # key -> first item with that key; dict order is insertion order, and
+    # setdefault leaves an existing entry alone, so mandatory items win ties
+    first = {}
+    keep_first = first.setdefault
+    # Walk both lists in order without building a concatenated copy
+    for item in chain(mandatory, optional):
         # strip off the optional prefix for the purpose of deduplication
-        key = item.lower().replace("(optional)", "").strip()
-        if key not in seen:
-            seen.add(key)
-            combined.append(item)
-    return combined
+        keep_first(item.lower().replace("(optional)", "").strip(), item)
+    return list(first.values())
 
 def flatten_comma_variants(entity: str) -> List[str]:
     """
@@ -309,7 +355,7 @@ def flatten_comma_variants(entity: str) -> List[str]:
         "Alpha, Beta, Gamma"    -> ["Alpha", "Beta", "Gamma"]
     """
     # 1) extract any leading "(...)" prefix (not just "optional"):
-    m = re.match(r'^\(\s*[^)]+\)\s*', entity)
+    m = _ANY_PREFIX_RE.match(entity)
     if m:
         prefix = m.group(0).strip() # e.g. "(optional)" or "(Opt)" or "(Foo)"
         rest = entity[m.end():]
@@ -337,12 +383,12 @@ def clean_brackets(item: str) -> str:
     
     # If starting with (optioanl), record it
     prefix_optional = ''
-    match = re.match(r'^\(optional\)\s*', item, flags=re.IGNORECASE)
+    match = _OPTIONAL_LEADING_RE.match(item)
     if match:
         prefix_optional = match.group(0).lower()  
         item = item[match.end():]  
     
-    item = re.sub(r'\s*\([^)]*\)', '', item).strip()
+    item = _PAREN_GROUP_RE.sub('', item).strip()
 
     return f"{prefix_optional}{item}".strip()
 
@@ -359,13 +405,13 @@ def parse_association_line(line: str) -> list[list[str]]:
     line = line.strip()
     if not line or '-' not in line:
         return []
-    is_opt = bool(re.match(r'^\((?:optional|opt)\)', line, re.IGNORECASE))
+    is_opt = bool(_OPT_OR_OPTIONAL_PREFIX_RE.match(line))
     if is_opt:
-        line = re.sub(r'^\((?:optional|opt)\)\s*', '', line, flags=re.IGNORECASE)
+        line = _OPT_OR_OPTIONAL_PREFIX_WS_RE.sub('', line)
     line = line.replace('"','').strip()
     left, right = [p.strip() for p in line.split('-',1)]
     # split on or/and
-    parts = re.split(r'\s+or\s+|\s+and\s+', right, flags=re.IGNORECASE)
+    parts = _OR_AND_SPLIT_RE.split(right)
     pairs = []
     for part in parts:
         # handle commas
@@ -388,16 +434,17 @@ def combine_and_deduplicate_associations(
         optional: List of optional associations (may include (Optional)/(Opt) tags).
 
     Returns:
-        final_refined: Subset of final_list originally from refined.
-        final_optional: Subset of final_list originally from optional.
+        final_refined: Deduplicated associations originally from refined.
+        final_optional: Deduplicated associations originally from optional.
     """
-    combined = refined + optional
-    is_optional_mask = [False] * len(refined) + [True] * len(optional)
+    # Items from index n_refined on came from `optional`; no per-item flag
+    # list or concatenated copy is built for that
+    n_refined = len(refined)
 
     # Clean optional tags (case-insensitive)
     cleaned = [
-        re.sub(r'\((optional|opt)\)', '', item, flags=re.IGNORECASE).strip()
-        for item in combined
+        _OPT_TAG_GROUP_RE.sub('', item).strip()
+        for item in chain(refined, optional)
     ]
     # Step 2: Normalize each side of the association
     normalized = []
@@ -413,22 +460,20 @@ def combine_and_deduplicate_associations(
             normalized.append(assoc.lower().strip())  # fallback if malformed
 
     seen = set()
-    final_list = []
     final_refined = []
     final_optional = []
 
-    for item, is_optional in zip(normalized, is_optional_mask):
+    for i, item in enumerate(normalized):
         key = '-'.join(sorted(item.split('-')))
         if key not in seen:
             seen.add(key)
-            final_list.append(item)
-            if is_optional:
+            if i >= n_refined:
                 final_optional.append(f"(Optional) {item}")
             else:
                 final_refined.append(item)
 
-    final_refined = [re.sub(r'\(Optional\)\s*\*\s*', '(Optional)', item) for item in final_refined]
-    final_optional = [re.sub(r'\(Optional\)\s*\*\s*', '(Optional)', item) for item in final_optional]
+    final_refined = [_OPTIONAL_STAR_RE.sub('(Optional)', item) for item in final_refined]
+    final_optional = [_OPTIONAL_STAR_RE.sub('(Optional)', item) for item in final_optional]
 
     final_refined = [
         clean_brackets(item) for item in final_refined